@@ -1,5 +1,7 @@
 from typing import Annotated
-from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel import SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from fastapi import Depends, FastAPI
 
 # Configuración para MySQL
@@ -9,15 +11,33 @@ mysql_host = "127.0.0.1"
 mysql_port = "3306"  
 mysql_db = "feel_your_emotions" 
 mysql_url = f"mysql+mysqlconnector://{mysql_user}:{mysql_password}@{mysql_host}:{mysql_port}/{mysql_db}"
+mysql_async_url = f"mysql+aiomysql://{mysql_user}:{mysql_password}@{mysql_host}:{mysql_port}/{mysql_db}"
 
-engine = create_engine(mysql_url)
+# Pool de conexiones: reutiliza conexiones abiertas y descarta las caídas
+pool_options = dict(
+    pool_size=20,
+    max_overflow=10,
+    pool_timeout=30,
+    pool_pre_ping=True,
+    pool_recycle=3600
+)
+
+# Motor síncrono: servicios, análisis de datos y creación de tablas
+engine = create_engine(mysql_url, **pool_options)
+
+# Motor asíncrono: endpoints de la API (no bloquea el event loop)
+async_engine = create_async_engine(mysql_async_url, **pool_options)
+
+# Fábrica de sesiones asíncronas: los objetos siguen accesibles tras el commit
+# sin recargarlos (evita consultas implícitas, que no se permiten en async)
+async_session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
 
 def create_all_tables(app: FastAPI):
     SQLModel.metadata.create_all(engine)
     yield
 
-def get_session():
-    with Session(engine) as session:
+async def get_session():
+    async with async_session_factory() as session:
         yield session
 
-session_dependency = Annotated[Session, Depends(get_session)]
\ No newline at end of file
+session_dependency = Annotated[AsyncSession, Depends(get_session)]
\ No newline at end of file
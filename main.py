@@ -1,8 +1,8 @@
+import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from src.routers import user, survey, visualizations
+from src.routers import user, survey
 from db import create_all_tables
-from src.utils.demo_info import DemoGenerator
 
 #origins = [
 #    "http://localhost",
@@ -14,12 +14,17 @@ origins = ["*"]
 app = FastAPI(lifespan=create_all_tables)
 app.include_router(user.router)
 app.include_router(survey.router)
-app.include_router(visualizations.router)
+# Las visualizaciones cargan pandas (y matplotlib al pedir el primer gráfico); se pueden desactivar con ENABLE_VIZ=0
+if os.environ.get("ENABLE_VIZ", "1") != "0":
+    from src.routers import visualizations
+    app.include_router(visualizations.router)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Cursor de paginación de los listados, legible desde el navegador
+    expose_headers=["X-Next-Cursor"],
 )
 @app.get("/")
 async def root():
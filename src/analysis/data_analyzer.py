@@ -5,14 +5,72 @@ Proporciona funciones para analizar patrones en los datos emocionales.
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from typing import Dict, List, Any, Optional, Tuple
 import os
+import glob
+import contextlib
+import tempfile
+import json
+import hashlib
+import orjson
 from datetime import datetime, timedelta
+from sqlmodel import select
+from fastapi import BackgroundTasks
 
-from ..services.user import UserService
-from ..services.survey import SurveyService
+from db import engine
+from ..models.user import User
+from ..models.survey import Survey, STANDARD_QUESTIONS
+
+# Columnas emocionales (enteros pequeños acotados): float32 basta y reduce a la
+# mitad el ancho de banda en correlaciones, agregaciones y máscaras
+EMOTIONAL_COLUMNS = ['mood', 'wellness_score', 'anxiety', 'sleep',
+                     'social', 'energy', 'stress', 'hopeful']
+
+# Columnas de texto con pocos valores distintos: como 'category' los groupby,
+# value_counts y merges operan sobre códigos enteros en lugar de cadenas
+CATEGORICAL_COLUMNS = ['context', 'gender', 'survey_type']
+
+# Categorías de la tendencia del estado de ánimo por usuario
+TREND_CATEGORIES = ['mejorando', 'empeorando', 'estable']
+
+
+def compute_wellness_batch(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calcula el puntaje de bienestar y la alerta de crisis de muchas encuestas a
+    la vez, con las mismas reglas que `Survey._update_calculated_fields` pero
+    operando por columnas con numpy en lugar de fila a fila.
+    
+    Args:
+        df (pd.DataFrame): Encuestas con las columnas de respuestas (1-5, NaN si falta)
+        
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (wellness_score, crisis_alert) por fila
+    """
+    answers = {
+        key: df[key].to_numpy(dtype=np.float32, na_value=np.nan)
+        if key in df.columns else np.full(len(df), np.nan, dtype=np.float32)
+        for key in STANDARD_QUESTIONS
+    }
+    answered = ~np.isnan(np.stack(list(answers.values())))
+    # Las respuestas ausentes cuentan como neutras (3), igual que en el modelo
+    filled = {key: np.nan_to_num(values, nan=3.0) for key, values in answers.items()}
+    
+    positive_avg = np.stack([filled[k] for k in ('sleep', 'social', 'energy', 'hopeful')]).mean(axis=0)
+    negative_avg = (filled['anxiety'] + filled['stress']) / 2
+    wellness = np.clip(filled['mood'] * 0.4 + positive_avg * 0.3 + (6 - negative_avg) * 0.3, 1, 5)
+    # Encuesta sin ninguna respuesta: puntaje 0
+    wellness = np.where(answered.any(axis=0), wellness, 0.0).astype(np.float64)
+    
+    # Las comparaciones con NaN son falsas: una respuesta ausente no suma riesgo
+    low_mood = answers['mood'] <= 2
+    risk_count = (
+        low_mood.astype(np.int8)
+        + (answers['anxiety'] >= 4) + (answers['stress'] >= 4)
+        + (np.stack([answers[k] for k in ('sleep', 'social', 'energy', 'hopeful')]) <= 2).sum(axis=0)
+    )
+    crisis = low_mood | (answers['hopeful'] <= 1) | (risk_count >= 4)
+    
+    return wellness, crisis
 
 
 class EmotionalDataAnalyzer:
@@ -24,22 +82,25 @@ class EmotionalDataAnalyzer:
     """
     
     def __init__(self, data_path: str = "data/processed", 
-                output_path: str = "data/exports"):
+                output_path: str = "data/exports",
+                use_parquet: bool = False):
         """
         Inicializa el analizador de datos.
         
         Args:
             data_path (str): Ruta de los datos procesados
             output_path (str): Ruta para guardar resultados
+            use_parquet (bool): Si True, persiste los datos en Parquet (requiere pyarrow)
+                en lugar de CSV
         """
         self.data_path = data_path
         self.output_path = output_path
-        self.user_service = UserService(data_path)
-        self.survey_service = SurveyService(data_path)
+        self.use_parquet = use_parquet
         
-        # Configurar estilo de gráficos
-        plt.style.use('seaborn-v0_8')
-        sns.set_palette("husl")
+        # Caché en memoria de (users_df, surveys_df) para evitar recargas
+        self._data_cache: Optional[Tuple[pd.DataFrame, pd.DataFrame]] = None
+        # Versión (hash) de los datos cargados; clave de la caché en disco
+        self._data_version: Optional[str] = None
         
         # Crear directorios si no existen
         os.makedirs(output_path, exist_ok=True)
@@ -56,50 +117,36 @@ class EmotionalDataAnalyzer:
             # Crear directorio si no existe
             os.makedirs(self.data_path, exist_ok=True)
             
-            users_file = os.path.join(self.data_path, "users.csv")
-            surveys_file = os.path.join(self.data_path, "surveys.csv")
-            
-            # Obtener usuarios y encuestas de los servicios
-            users = self.user_service.get_all_users()
-            surveys = self.survey_service.get_all_surveys()
+            users_file = self._data_file("users")
+            surveys_file = self._data_file("surveys")
             
-            # Convertir a DataFrames
-            users_data = []
-            for user in users:
-                users_data.append({
-                    'user_id': user.user_id,
-                    'name': user.name,
-                    'age': user.age,
-                    'context': user.context,
-                    'gender': user.gender
-                })
-            
-            surveys_data = []
-            for survey in surveys:
-                surveys_data.append({
-                    'survey_id': survey.survey_id,
-                    'user_id': survey.user_id,
-                    'date': survey.date,
-                    'mood': survey.mood,
-                    'wellness_score': survey.wellness_score,
-                    'crisis_alert': survey.crisis_alert,
-                    'anxiety': survey.anxiety,
-                    'sleep': survey.sleep,
-                    'social': survey.social,
-                    'energy': survey.energy,
-                    'stress': survey.stress,
-                    'hopeful': survey.hopeful,
-                    'survey_type': survey.survey_type
-                })
+            # Leer usuarios y encuestas directamente a DataFrames (sin hidratar objetos ORM)
+            users_df = pd.read_sql_query(
+                select(User.user_id, User.name, User.age, User.context, User.gender),
+                engine
+            )
+            surveys_df = pd.read_sql_query(
+                select(
+                    Survey.survey_id, Survey.user_id, Survey.date, Survey.mood,
+                    Survey.wellness_score, Survey.crisis_alert, Survey.anxiety,
+                    Survey.sleep, Survey.social, Survey.energy, Survey.stress,
+                    Survey.hopeful, Survey.survey_type
+                ),
+                engine
+            )
             
-            # Guardar a CSV
-            if users_data:
-                pd.DataFrame(users_data).to_csv(users_file, index=False)
-                print(f"✅ Archivo de usuarios actualizado: {len(users_data)} registros")
+            # Guardar a CSV o Parquet (solo si el contenido cambió)
+            if not users_df.empty:
+                if self._write_frame(users_df, users_file):
+                    print(f"✅ Archivo de usuarios actualizado: {len(users_df)} registros")
+                else:
+                    print(f"ℹ️ Archivo de usuarios sin cambios: {len(users_df)} registros")
             
-            if surveys_data:
-                pd.DataFrame(surveys_data).to_csv(surveys_file, index=False)
-                print(f"✅ Archivo de encuestas actualizado: {len(surveys_data)} registros")
+            if not surveys_df.empty:
+                if self._write_frame(surveys_df, surveys_file):
+                    print(f"✅ Archivo de encuestas actualizado: {len(surveys_df)} registros")
+                else:
+                    print(f"ℹ️ Archivo de encuestas sin cambios: {len(surveys_df)} registros")
             
             return True
             
@@ -107,37 +154,242 @@ class EmotionalDataAnalyzer:
             print(f"❌ Error al generar/actualizar archivos CSV: {str(e)}")
             return False
     
+    def _data_file(self, name: str) -> str:
+        """
+        Devuelve la ruta del archivo de datos según el formato configurado.
+        
+        Args:
+            name (str): Nombre base del archivo ('users' o 'surveys')
+            
+        Returns:
+            str: Ruta del archivo .csv o .parquet
+        """
+        extension = "parquet" if self.use_parquet else "csv"
+        return os.path.join(self.data_path, f"{name}.{extension}")
+    
+    @staticmethod
+    def _frame_hash(df: pd.DataFrame) -> str:
+        """Calcula un hash del contenido del DataFrame (columnas y valores)."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(",".join(map(str, df.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+        return digest.hexdigest()
+    
+    def _write_frame(self, df: pd.DataFrame, path: str) -> bool:
+        """
+        Escribe un DataFrame en el formato configurado.
+        
+        La escritura es atómica (archivo temporal + os.replace) y se omite si
+        el contenido coincide con el registrado en el archivo `.meta.json`.
+        
+        Args:
+            df (pd.DataFrame): Datos a escribir
+            path (str): Ruta de destino
+            
+        Returns:
+            bool: True si se escribió el archivo, False si no había cambios
+        """
+        if self.use_parquet:
+            # survey_type llega como Enum; se guarda su valor como texto
+            if 'survey_type' in df.columns:
+                df = df.assign(survey_type=df['survey_type'].map(lambda t: getattr(t, 'value', t)))
+            df = self._compact_dtypes(df)
+        
+        meta_file = f"{path}.meta.json"
+        content_hash = self._frame_hash(df)
+        if os.path.exists(path) and os.path.exists(meta_file):
+            try:
+                with open(meta_file, 'r', encoding='utf-8') as f:
+                    if json.load(f).get('hash') == content_hash:
+                        return False
+            except (OSError, ValueError):
+                pass  # Metadatos ilegibles: se reescribe el archivo
+        
+        tmp_file = f"{path}.tmp"
+        if self.use_parquet:
+            df.to_parquet(tmp_file, engine='pyarrow', compression='snappy', index=False)
+        else:
+            df.to_csv(tmp_file, index=False)
+        os.replace(tmp_file, path)
+        
+        with open(meta_file, 'w', encoding='utf-8') as f:
+            json.dump({'hash': content_hash, 'rows': len(df)}, f)
+        return True
+    
+    def _read_frame(self, path: str) -> pd.DataFrame:
+        """Lee un DataFrame en el formato configurado."""
+        if self.use_parquet:
+            return pd.read_parquet(path, engine='pyarrow')
+        return pd.read_csv(path)
+    
+    @staticmethod
+    def _compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Reduce las columnas emocionales a float32, crisis_alert a int8, la edad
+        a int16 y las columnas de texto de baja cardinalidad a 'category'.
+        wellness_score se mantiene en float64: es un promedio ponderado con
+        decimales que float32 no representa exactamente.
+        """
+        dtypes = {c: 'float32' for c in EMOTIONAL_COLUMNS
+                  if c in df.columns and c != 'wellness_score'}
+        if 'crisis_alert' in df.columns:
+            dtypes['crisis_alert'] = 'int8'
+        # La edad solo se reduce si no tiene nulos (int16 no admite NaN)
+        if 'age' in df.columns and df['age'].notna().all():
+            dtypes['age'] = 'int16'
+        dtypes.update({c: 'category' for c in CATEGORICAL_COLUMNS if c in df.columns})
+        return df.astype(dtypes) if dtypes else df
+    
+    @staticmethod
+    def _as_float64(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Devuelve las columnas float32 como float64. Se aplica antes de redondear
+        o exportar resultados: un float32 redondeado no es exactamente
+        representable y al convertirlo a float de Python arrastra el error
+        (p. ej. 3.43 -> 3.430000066757202).
+        """
+        float32_columns = df.select_dtypes('float32').columns
+        if float32_columns.empty:
+            return df
+        return df.astype({c: 'float64' for c in float32_columns})
+    
+    @staticmethod
+    def _fill_calculated_fields(surveys_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Completa wellness_score y crisis_alert de las encuestas guardadas sin
+        calcularlos (wellness_score nulo o con el valor por defecto 0), usando
+        el cálculo vectorizado del modelo en una sola pasada.
+        """
+        if 'wellness_score' not in surveys_df.columns:
+            return surveys_df
+        missing = surveys_df['wellness_score'].isna() | surveys_df['wellness_score'].eq(0)
+        if not missing.any():
+            return surveys_df
+        
+        wellness, crisis = compute_wellness_batch(surveys_df.loc[missing])
+        surveys_df = surveys_df.copy()
+        surveys_df.loc[missing, 'wellness_score'] = wellness.astype(surveys_df['wellness_score'].dtype)
+        if 'crisis_alert' in surveys_df.columns:
+            surveys_df.loc[missing, 'crisis_alert'] = crisis.astype(surveys_df['crisis_alert'].dtype)
+        return surveys_df
+    
     def load_data(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
         """
         Carga los datos de usuarios y encuestas.
         Si los archivos CSV no existen o están desactualizados, los genera.
+        El resultado se guarda en caché por instancia; use `invalidate_cache`
+        o `force_update_csv_files` para recargar.
         
         Returns:
             Tuple[pd.DataFrame, pd.DataFrame]: DataFrames de usuarios y encuestas
         """
+        if self._data_cache is not None:
+            return self._data_cache
+        
         # Asegurar que los archivos existan y estén actualizados
         self._ensure_csv_files()
         
-        users_file = os.path.join(self.data_path, "users.csv")
-        surveys_file = os.path.join(self.data_path, "surveys.csv")
+        users_file = self._data_file("users")
+        surveys_file = self._data_file("surveys")
         
         users_df = pd.DataFrame()
         surveys_df = pd.DataFrame()
         
         if os.path.exists(users_file):
-            users_df = pd.read_csv(users_file)
+            users_df = self._compact_dtypes(self._read_frame(users_file))
             print(f"✅ Cargados {len(users_df)} usuarios")
         else:
             print("⚠️ No se encontró el archivo de usuarios")
         
         if os.path.exists(surveys_file):
-            surveys_df = pd.read_csv(surveys_file)
-            surveys_df['date'] = pd.to_datetime(surveys_df['date'])
+            surveys_df = self._read_frame(surveys_file)
+            # Parquet conserva el tipo datetime; CSV requiere convertirlo
+            if not self.use_parquet:
+                surveys_df['date'] = pd.to_datetime(surveys_df['date'])
+            surveys_df = self._fill_calculated_fields(surveys_df)
+            surveys_df = self._compact_dtypes(surveys_df)
+            # Orden cronológico: permite filtrar rangos de fechas por búsqueda binaria
+            surveys_df = surveys_df.sort_values('date', kind='stable', ignore_index=True)
             print(f"✅ Cargadas {len(surveys_df)} encuestas")
         else:
             print("⚠️ No se encontró el archivo de encuestas")
         
-        return users_df, surveys_df
+        self._data_cache = (users_df, surveys_df)
+        return self._data_cache
+    
+    def invalidate_cache(self) -> None:
+        """Descarta los datos en caché para que la próxima carga lea de nuevo."""
+        self._data_cache = None
+        self._data_version = None
+    
+    def _get_data_version(self) -> str:
+        """
+        Devuelve un identificador del contenido de los datos cargados.
+        
+        Reutiliza los hashes guardados en los `.meta.json` al escribir los
+        archivos; si no existen, los calcula a partir de los DataFrames.
+        
+        Returns:
+            str: Hash corto que cambia cuando cambian los datos
+        """
+        if self._data_version is None:
+            users_df, surveys_df = self.load_data()
+            digest = hashlib.blake2b(digest_size=8)
+            for name, df in (("users", users_df), ("surveys", surveys_df)):
+                content_hash = None
+                try:
+                    with open(f"{self._data_file(name)}.meta.json", 'r', encoding='utf-8') as f:
+                        content_hash = json.load(f).get('hash')
+                except (OSError, ValueError):
+                    pass
+                digest.update((content_hash or self._frame_hash(df)).encode())
+            self._data_version = digest.hexdigest()
+        return self._data_version
+    
+    def _memoize(self, name: str, compute) -> Any:
+        """
+        Memoriza en disco el resultado de un análisis según la versión de los datos.
+        
+        Los resultados se guardan junto a los datos que los originan, en
+        `{data_path}/.cache/{name}_{version}.pkl`; al cambiar los datos la clave
+        cambia y las entradas antiguas se eliminan. Cada escritura usa un archivo
+        temporal propio y `os.replace`, de modo que varios procesos pueden
+        memorizar el mismo análisis a la vez sin pisarse.
+        
+        Args:
+            name (str): Nombre del análisis
+            compute (callable): Función sin argumentos que calcula el resultado
+            
+        Returns:
+            Any: Resultado leído de la caché o recién calculado
+        """
+        cache_dir = os.path.join(self.data_path, ".cache")
+        cache_file = os.path.join(cache_dir, f"{name}_{self._get_data_version()}.pkl")
+        
+        if os.path.exists(cache_file):
+            try:
+                return pd.read_pickle(cache_file)
+            except Exception:
+                pass  # Entrada corrupta o incompatible: se recalcula
+        
+        result = compute()
+        
+        os.makedirs(cache_dir, exist_ok=True)
+        for stale_file in glob.glob(os.path.join(cache_dir, f"{name}_*.pkl")):
+            # Otro proceso puede haberla eliminado ya
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(stale_file)
+        with tempfile.NamedTemporaryFile(dir=cache_dir, prefix=f"{name}_", suffix=".tmp",
+                                         delete=False) as tmp:
+            tmp_file = tmp.name
+        try:
+            pd.to_pickle(result, tmp_file)
+            os.replace(tmp_file, cache_file)
+        except Exception:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(tmp_file)
+            raise
+        return result
     
     def generate_descriptive_statistics(self) -> Dict[str, Any]:
         """
@@ -155,54 +407,72 @@ class EmotionalDataAnalyzer:
             'general': {}
         }
         
+        # Columnas esperadas en una sola pasada: las ausentes quedan como NaN
+        users = users_df.reindex(columns=['age', 'context', 'gender'])
+        surveys = surveys_df.reindex(
+            columns=['user_id', 'mood', 'wellness_score', 'crisis_alert', 'survey_type', 'date']
+        )
+        
         # Estadísticas de usuarios
         if not users_df.empty:
+            age = users['age']
             stats['usuarios'] = {
-                'total': len(users_df),
-                'edad_promedio': users_df['age'].mean() if 'age' in users_df.columns else 0,
-                'edad_mediana': users_df['age'].median() if 'age' in users_df.columns else 0,
-                'edad_min': users_df['age'].min() if 'age' in users_df.columns else 0,
-                'edad_max': users_df['age'].max() if 'age' in users_df.columns else 0
+                'total': len(users),
+                'edad_promedio': self._or_zero(age.mean()),
+                'edad_mediana': self._or_zero(age.median()),
+                'edad_min': self._or_zero(age.min()),
+                'edad_max': self._or_zero(age.max()),
+                # Distribución por contexto y género
+                'contextos': self._counts(users['context']),
+                'generos': self._counts(users['gender'])
             }
-            
-            # Distribución por contexto y género
-            if 'context' in users_df.columns:
-                context_counts = users_df['context'].value_counts().to_dict()
-                stats['usuarios']['contextos'] = context_counts
-            
-            if 'gender' in users_df.columns:
-                gender_counts = users_df['gender'].value_counts().to_dict()
-                stats['usuarios']['generos'] = gender_counts
         
         # Estadísticas de encuestas
         if not surveys_df.empty:
+            # Valores reutilizados: cada uno recorre la columna completa una sola vez
+            total_surveys = len(surveys)
+            unique_users = surveys['user_id'].nunique()
+            crisis_total = surveys['crisis_alert'].sum()
+            
             stats['encuestas'] = {
-                'total': len(surveys_df),
-                'usuarios_unicos': surveys_df['user_id'].nunique() if 'user_id' in surveys_df.columns else 0,
-                'mood_promedio': surveys_df['mood'].mean() if 'mood' in surveys_df.columns else 0,
-                'wellness_promedio': surveys_df['wellness_score'].mean() if 'wellness_score' in surveys_df.columns else 0,
-                'crisis_total': surveys_df['crisis_alert'].sum() if 'crisis_alert' in surveys_df.columns else 0,
-                'encuestas_por_usuario': len(surveys_df) / surveys_df['user_id'].nunique() if 'user_id' in surveys_df.columns and surveys_df['user_id'].nunique() > 0 else 0
+                'total': total_surveys,
+                'usuarios_unicos': unique_users,
+                'mood_promedio': self._or_zero(surveys['mood'].astype('float64').mean()),
+                'wellness_promedio': self._or_zero(surveys['wellness_score'].astype('float64').mean()),
+                'crisis_total': crisis_total,
+                'encuestas_por_usuario': total_surveys / unique_users if unique_users > 0 else 0,
+                # Distribución por tipo de encuesta
+                'tipos': self._counts(surveys['survey_type'])
             }
-            
-            # Distribución por tipo de encuesta
-            if 'survey_type' in surveys_df.columns:
-                type_counts = surveys_df['survey_type'].value_counts().to_dict()
-                stats['encuestas']['tipos'] = type_counts
         
         # Estadísticas generales
         if not users_df.empty and not surveys_df.empty:
+            start, end = surveys['date'].min(), surveys['date'].max()
             stats['general'] = {
-                'tasa_participacion': (surveys_df['user_id'].nunique() / len(users_df)) * 100 if len(users_df) > 0 else 0,
-                'tasa_crisis': (surveys_df['crisis_alert'].sum() / len(surveys_df)) * 100 if len(surveys_df) > 0 else 0,
+                'tasa_participacion': (unique_users / len(users)) * 100,
+                'tasa_crisis': (crisis_total / total_surveys) * 100,
                 'periodo_datos': {
-                    'inicio': surveys_df['date'].min().isoformat() if 'date' in surveys_df.columns else None,
-                    'fin': surveys_df['date'].max().isoformat() if 'date' in surveys_df.columns else None
+                    'inicio': start.isoformat() if pd.notna(start) else None,
+                    'fin': end.isoformat() if pd.notna(end) else None
                 }
             }
         
         return stats
     
+    @staticmethod
+    def _counts(series: pd.Series) -> Dict[Any, int]:
+        """
+        Cuenta valores omitiendo las categorías sin apariciones
+        (value_counts sobre un 'category' incluye también las de conteo 0).
+        """
+        counts = series.value_counts()
+        return counts[counts > 0].to_dict()
+    
+    @staticmethod
+    def _or_zero(value: Any) -> Any:
+        """Devuelve 0 cuando el valor agregado es NaN (columna ausente o vacía)."""
+        return 0 if pd.isna(value) else value
+    
     def analyze_mood_trends(self, days: int = 30) -> pd.DataFrame:
         """
         Analiza tendencias del estado de ánimo.
@@ -222,20 +492,22 @@ class EmotionalDataAnalyzer:
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days)
         
-        recent_surveys = surveys_df[
-            (surveys_df['date'] >= start_date) & 
-            (surveys_df['date'] <= end_date)
-        ].copy()
+        # load_data entrega las encuestas ordenadas por fecha: se recorta el
+        # rango con búsqueda binaria en lugar de una máscara y una copia
+        dates = surveys_df['date'].to_numpy()
+        first = dates.searchsorted(np.datetime64(start_date), side='left')
+        last = dates.searchsorted(np.datetime64(end_date), side='right')
+        recent_surveys = surveys_df.iloc[first:last]
         
         if recent_surveys.empty:
             return pd.DataFrame()
         
         # Agregar por día
-        daily_trends = recent_surveys.groupby(recent_surveys['date'].dt.date).agg({
+        daily_trends = self._as_float64(recent_surveys.groupby(recent_surveys['date'].dt.date).agg({
             'mood': ['mean', 'std', 'count'],
             'wellness_score': ['mean', 'std'],
             'crisis_alert': 'sum'
-        }).round(2)
+        })).round(2)
         
         # Aplanar columnas multinivel
         daily_trends.columns = ['_'.join(col).strip() for col in daily_trends.columns.values]
@@ -246,80 +518,104 @@ class EmotionalDataAnalyzer:
     def analyze_user_risk_patterns(self) -> pd.DataFrame:
         """
         Analiza patrones de riesgo por usuario.
+        El resultado se memoriza en disco; solo `days_since_last`, que depende
+        de la fecha actual, se recalcula en cada llamada.
         
         Returns:
             pd.DataFrame: Análisis de riesgo por usuario
         """
+        user_analysis = self._memoize("user_risk_patterns", self._compute_user_risk_patterns)
+        
+        if user_analysis.empty:
+            return user_analysis
+        
+        days_since_last = (datetime.now() - user_analysis['last_survey']).dt.days
+        return user_analysis.assign(days_since_last=days_since_last)
+    
+    def _compute_user_risk_patterns(self) -> pd.DataFrame:
+        """
+        Calcula las métricas por usuario (sin `days_since_last`).
+        
+        Returns:
+            pd.DataFrame: Métricas agregadas por usuario
+        """
         users_df, surveys_df = self.load_data()
         
         if users_df.empty or surveys_df.empty:
             return pd.DataFrame()
         
-        # Combinar datos de usuarios y encuestas
-        user_analysis = []
+        # Agregar todas las métricas por usuario en una sola pasada; los promedios
+        # se exportan sin redondear, así que se calculan ya en float64
+        grouped = self._as_float64(surveys_df).groupby('user_id', sort=False)
+        survey_stats = grouped.agg(
+            total_surveys=('user_id', 'size'),
+            avg_mood=('mood', 'mean'),
+            avg_wellness=('wellness_score', 'mean'),
+            avg_anxiety=('anxiety', 'mean'),
+            avg_sleep=('sleep', 'mean'),
+            avg_social=('social', 'mean'),
+            avg_energy=('energy', 'mean'),
+            avg_stress=('stress', 'mean'),
+            avg_hopeful=('hopeful', 'mean'),
+            crisis_count=('crisis_alert', 'sum'),
+            last_survey=('date', 'max')
+        )
+        survey_stats['crisis_rate'] = survey_stats['crisis_count'] / survey_stats['total_surveys'] * 100
+        survey_stats['mood_trend'] = self._calculate_trends(surveys_df).reindex(survey_stats.index)
         
-        for _, user in users_df.iterrows():
-            user_id = user['user_id']
-            user_surveys = surveys_df[surveys_df['user_id'] == user_id]
-            
-            if not user_surveys.empty:
-                # Calcular indicadores de bienestar
-                wellness_indicators = {
-                    'anxiety': user_surveys['anxiety'].mean() if 'anxiety' in user_surveys else None,
-                    'sleep': user_surveys['sleep'].mean() if 'sleep' in user_surveys else None,
-                    'social': user_surveys['social'].mean() if 'social' in user_surveys else None,
-                    'energy': user_surveys['energy'].mean() if 'energy' in user_surveys else None,
-                    'stress': user_surveys['stress'].mean() if 'stress' in user_surveys else None,
-                    'hopeful': user_surveys['hopeful'].mean() if 'hopeful' in user_surveys else None
-                }
-                
-                analysis = {
-                    'user_id': user_id,
-                    'name': user.get('name', 'N/A'),
-                    'age': user.get('age', 0),
-                    'context': user.get('context', 'N/A'),
-                    'total_surveys': len(user_surveys),
-                    'avg_mood': user_surveys['mood'].mean() if 'mood' in user_surveys else 0,
-                    'avg_wellness': user_surveys['wellness_score'].mean() if 'wellness_score' in user_surveys else 0,
-                    'avg_anxiety': wellness_indicators['anxiety'],
-                    'avg_sleep': wellness_indicators['sleep'],
-                    'avg_social': wellness_indicators['social'],
-                    'avg_energy': wellness_indicators['energy'],
-                    'avg_stress': wellness_indicators['stress'],
-                    'avg_hopeful': wellness_indicators['hopeful'],
-                    'crisis_count': user_surveys['crisis_alert'].sum(),
-                    'crisis_rate': (user_surveys['crisis_alert'].sum() / len(user_surveys)) * 100 if len(user_surveys) > 0 else 0,
-                    'mood_trend': self._calculate_trend(user_surveys['mood'].tolist() if 'mood' in user_surveys else []),
-                    'last_survey': user_surveys['date'].max(),
-                    'days_since_last': (datetime.now() - user_surveys['date'].max()).days
-                }
-                user_analysis.append(analysis)
+        # Combinar con los datos de usuarios (solo usuarios con encuestas)
+        user_analysis = users_df[['user_id', 'name', 'age', 'context']].merge(
+            survey_stats.reset_index(), on='user_id', how='inner'
+        )
         
-        return pd.DataFrame(user_analysis)
+        return user_analysis[[
+            'user_id', 'name', 'age', 'context', 'total_surveys',
+            'avg_mood', 'avg_wellness', 'avg_anxiety', 'avg_sleep', 'avg_social',
+            'avg_energy', 'avg_stress', 'avg_hopeful', 'crisis_count', 'crisis_rate',
+            'mood_trend', 'last_survey'
+        ]]
     
-    def _calculate_trend(self, values: List[float]) -> str:
+    def _calculate_trends(self, surveys_df: pd.DataFrame) -> pd.Series:
         """
-        Calcula la tendencia de una serie de valores.
+        Calcula la tendencia del estado de ánimo de todos los usuarios a la vez.
+        
+        Usa la correlación de Pearson entre el orden cronológico de las encuestas
+        y el ánimo, calculada en forma cerrada a partir de sumas por usuario.
         
         Args:
-            values (List[float]): Lista de valores
+            surveys_df (pd.DataFrame): Encuestas con columnas user_id, date y mood
             
         Returns:
-            str: 'mejorando', 'empeorando', o 'estable'
+            pd.Series: 'mejorando', 'empeorando', o 'estable' (categórica) indexado por user_id
         """
-        if len(values) < 2:
-            return 'estable'
-        
-        # Usar correlación con índices para determinar tendencia
-        indices = list(range(len(values)))
-        correlation = np.corrcoef(indices, values)[0, 1]
+        ordered = surveys_df[['user_id', 'date', 'mood']].sort_values(['user_id', 'date'])
+        x = ordered.groupby('user_id', sort=False).cumcount().astype(float)
+        y = ordered['mood'].astype(float)
+        sums = pd.DataFrame({
+            'user_id': ordered['user_id'],
+            'x': x, 'y': y, 'xy': x * y, 'x2': x * x, 'y2': y * y,
+            'missing': y.isna()
+        }).groupby('user_id', sort=False).agg(
+            n=('x', 'size'), sx=('x', 'sum'), sy=('y', 'sum'), sxy=('xy', 'sum'),
+            sx2=('x2', 'sum'), sy2=('y2', 'sum'), missing=('missing', 'any')
+        )
         
-        if correlation > 0.3:
-            return 'mejorando'
-        elif correlation < -0.3:
-            return 'empeorando'
-        else:
-            return 'estable'
+        n = sums['n'].to_numpy(dtype=float)
+        numerator = n * sums['sxy'].to_numpy() - sums['sx'].to_numpy() * sums['sy'].to_numpy()
+        denominator = np.sqrt(
+            (n * sums['sx2'].to_numpy() - sums['sx'].to_numpy() ** 2) *
+            (n * sums['sy2'].to_numpy() - sums['sy'].to_numpy() ** 2)
+        )
+        with np.errstate(divide='ignore', invalid='ignore'):
+            correlation = numerator / denominator
+        # Menos de 2 encuestas o valores faltantes: sin tendencia definida
+        correlation[(n < 2) | sums['missing'].to_numpy()] = np.nan
+        
+        # Se construye directamente como 'category' a partir de los códigos,
+        # así los value_counts/groupby posteriores no comparan cadenas
+        codes = np.select([correlation > 0.3, correlation < -0.3], [0, 1], default=2)
+        trends = pd.Categorical.from_codes(codes, categories=TREND_CATEGORIES)
+        return pd.Series(trends, index=sums.index)
     
     def analyze_gender_patterns(self) -> Dict[str, Any]:
         """
@@ -333,38 +629,43 @@ class EmotionalDataAnalyzer:
         if users_df.empty or 'gender' not in users_df.columns:
             return {}
             
+        # Conteo por género una sola vez (distribución y total de usuarios)
+        gender_counts = self._counts(users_df['gender'])
+        
         gender_analysis = {
-            'distribution': users_df['gender'].value_counts().to_dict(),
+            'distribution': gender_counts,
             'age_by_gender': {},
             'wellness_by_gender': {},
             'crisis_by_gender': {}
         }
         
         # Análisis de edad por género
-        age_stats = users_df.groupby('gender')['age'].agg(['mean', 'median', 'min', 'max']).round(1)
+        age_stats = users_df.groupby('gender', observed=True)['age'].agg(['mean', 'median', 'min', 'max']).round(1)
         gender_analysis['age_by_gender'] = age_stats.to_dict('index')
         
         # Análisis de bienestar por género
         if not surveys_df.empty:
-            surveys_with_gender = surveys_df.merge(
-                users_df[['user_id', 'gender']], 
-                on='user_id', 
-                how='left'
-            )
+            # Búsqueda por hash user_id -> género en lugar de un merge completo
+            gender_map = users_df.set_index('user_id')['gender']
+            surveys_with_gender = surveys_df.assign(gender=surveys_df['user_id'].map(gender_map))
             
-            wellness_stats = surveys_with_gender.groupby('gender').agg({
+            wellness_stats = self._as_float64(surveys_with_gender.groupby('gender', observed=True).agg({
                 'wellness_score': 'mean',
                 'mood': 'mean',
                 'crisis_alert': ['sum', 'mean']
-            }).round(2)
+            })).round(2)
             
             gender_analysis['wellness_by_gender'] = wellness_stats.to_dict('index')
             
-            # Calcular tasas de crisis por género
-            total_users_by_gender = users_df['gender'].value_counts()
-            users_with_crisis = surveys_with_gender[surveys_with_gender['crisis_alert'] > 0]['user_id'].nunique()
+            # Usuarios con al menos una alerta de crisis, por género
+            crisis_surveys = surveys_with_gender[surveys_with_gender['crisis_alert'] > 0]
+            users_with_crisis = (
+                crisis_surveys.groupby('gender', observed=True)['user_id'].nunique()
+                .reindex(list(gender_counts), fill_value=0)
+                .to_dict()
+            )
             gender_analysis['crisis_by_gender'] = {
-                'total_users': total_users_by_gender.to_dict(),
+                'total_users': gender_counts,
                 'users_with_crisis': users_with_crisis
             }
         
@@ -373,6 +674,16 @@ class EmotionalDataAnalyzer:
     def analyze_correlations(self) -> pd.DataFrame:
         """
         Analiza correlaciones entre variables emocionales.
+        El resultado se memoriza en disco según la versión de los datos.
+        
+        Returns:
+            pd.DataFrame: Matriz de correlaciones
+        """
+        return self._memoize("correlations", self._compute_correlations)
+    
+    def _compute_correlations(self) -> pd.DataFrame:
+        """
+        Calcula la matriz de correlaciones de Pearson.
         
         Returns:
             pd.DataFrame: Matriz de correlaciones
@@ -383,40 +694,75 @@ class EmotionalDataAnalyzer:
             return pd.DataFrame()
         
         # Seleccionar columnas numéricas para correlación
-        emotional_columns = [
-            'mood', 'wellness_score', 'anxiety', 'sleep', 
-            'social', 'energy', 'stress', 'hopeful'
-        ]
-        available_columns = [col for col in emotional_columns if col in surveys_df.columns]
+        available_columns = [col for col in EMOTIONAL_COLUMNS if col in surveys_df.columns]
         
         if len(available_columns) < 2:
             return pd.DataFrame()
         
-        correlation_matrix = surveys_df[available_columns].corr().round(3)
+        values = surveys_df[available_columns].to_numpy(dtype=np.float64)
+        
+        # Con valores faltantes se conserva la eliminación por pares de pandas
+        if len(values) < 2 or np.isnan(values).any():
+            return surveys_df[available_columns].corr().round(3)
+        
+        # Pearson con una sola multiplicación de matrices sobre los datos centrados
+        values -= values.mean(axis=0)
+        cov = values.T @ values / (len(values) - 1)
+        std = np.sqrt(np.diag(cov))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = cov / np.outer(std, std)
+        corr = np.clip(corr, -1.0, 1.0)
+        np.fill_diagonal(corr, np.where(std > 0, 1.0, np.nan))
+        
+        correlation_matrix = pd.DataFrame(
+            corr, index=available_columns, columns=available_columns
+        ).round(3)
         
         return correlation_matrix
     
-    def detect_risk_patterns(self, risk_threshold: float = 6.0) -> Dict[str, Any]:
+    @staticmethod
+    def _high_risk_mask(user_analysis: pd.DataFrame, risk_threshold: float = 6.0) -> np.ndarray:
+        """
+        Calcula la máscara de usuarios de alto riesgo en una sola expresión
+        sobre los arrays de numpy.
+        
+        Args:
+            user_analysis (pd.DataFrame): Resultado de `analyze_user_risk_patterns`
+            risk_threshold (float): Umbral de riesgo (basado en wellness_score)
+            
+        Returns:
+            np.ndarray: Array booleano, True para los usuarios de alto riesgo
+        """
+        wellness = user_analysis['avg_wellness'].to_numpy()
+        crisis_rate = user_analysis['crisis_rate'].to_numpy()
+        hopeful = user_analysis['avg_hopeful'].to_numpy()
+        return (
+            (wellness <= risk_threshold) |
+            (crisis_rate >= 30) |  # Más del 30% de encuestas en crisis
+            (hopeful <= 2)         # Baja esperanza como indicador de riesgo
+        )
+    
+    def detect_risk_patterns(self, risk_threshold: float = 6.0,
+                            user_analysis: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
         """
         Detecta patrones en usuarios de alto riesgo.
         
         Args:
             risk_threshold (float): Umbral de riesgo (basado en wellness_score)
+            user_analysis (pd.DataFrame, optional): Resultado previo de
+                `analyze_user_risk_patterns` para evitar recalcularlo
             
         Returns:
             dict: Análisis de patrones de riesgo
         """
-        user_analysis = self.analyze_user_risk_patterns()
+        if user_analysis is None:
+            user_analysis = self.analyze_user_risk_patterns()
         
         if user_analysis.empty:
             return {}
         
         # Identificar usuarios de alto riesgo basado en wellness_score y crisis_rate
-        high_risk_users = user_analysis[
-            (user_analysis['avg_wellness'] <= risk_threshold) |
-            (user_analysis['crisis_rate'] >= 30) |  # Más del 30% de encuestas en crisis
-            (user_analysis['avg_hopeful'] <= 2)     # Baja esperanza como indicador de riesgo
-        ]
+        high_risk_users = user_analysis[self._high_risk_mask(user_analysis, risk_threshold)]
         
         patterns = {
             'total_users': len(user_analysis),
@@ -430,11 +776,12 @@ class EmotionalDataAnalyzer:
                 'avg_age_high_risk': high_risk_users['age'].mean(),
                 'avg_mood_high_risk': high_risk_users['avg_mood'].mean(),
                 'avg_crisis_rate': high_risk_users['crisis_rate'].mean(),
-                'common_contexts': high_risk_users['context'].value_counts().to_dict(),
-                'gender_distribution': high_risk_users['gender'].value_counts().to_dict() if 'gender' in high_risk_users.columns else {},
-                'trend_distribution': high_risk_users['mood_trend'].value_counts().to_dict()
-            }        
-            return patterns
+                'common_contexts': self._counts(high_risk_users['context']),
+                'gender_distribution': self._counts(high_risk_users['gender']) if 'gender' in high_risk_users.columns else {},
+                'trend_distribution': self._counts(high_risk_users['mood_trend'])
+            }
+        
+        return patterns
     
     def generate_comprehensive_report(self) -> Dict[str, Any]:
         """
@@ -445,12 +792,17 @@ class EmotionalDataAnalyzer:
         """
         print("📊 Generando reporte completo de análisis...")
         
+        # Calcular cada análisis una sola vez y reutilizar los resultados
+        correlations = self.analyze_correlations()
+        trends = self.analyze_mood_trends()
+        user_analysis = self.analyze_user_risk_patterns()
+        
         report = {
             'estadisticas_descriptivas': self.generate_descriptive_statistics(),
-            'analisis_correlaciones': self.analyze_correlations().to_dict() if not self.analyze_correlations().empty else {},
-            'patrones_riesgo': self.detect_risk_patterns(),
-            'tendencias_recientes': self.analyze_mood_trends().to_dict('records') if not self.analyze_mood_trends().empty else [],
-            'analisis_usuarios': self.analyze_user_risk_patterns().to_dict('records') if not self.analyze_user_risk_patterns().empty else []
+            'analisis_correlaciones': correlations.to_dict() if not correlations.empty else {},
+            'patrones_riesgo': self.detect_risk_patterns(user_analysis=user_analysis),
+            'tendencias_recientes': trends.to_dict('records') if not trends.empty else [],
+            'analisis_usuarios': user_analysis.to_dict('records') if not user_analysis.empty else []
         }
         
         # Guardar reporte
@@ -459,9 +811,13 @@ class EmotionalDataAnalyzer:
             f"reporte_analisis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         )
         
-        import json
-        with open(report_file, 'w', encoding='utf-8') as f:
-            json.dump(report, f, ensure_ascii=False, indent=2)
+        # orjson serializa numpy y fechas de forma nativa y siempre emite UTF-8
+        with open(report_file, 'wb') as f:
+            f.write(orjson.dumps(
+                report,
+                default=self._orjson_default,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            ))
         
         print(f"✅ Reporte guardado en: {report_file}")
         
@@ -476,12 +832,18 @@ class EmotionalDataAnalyzer:
             bool: True si la actualización fue exitosa, False si hubo errores
         """
         print("🔄 Forzando actualización de archivos CSV...")
+        self.invalidate_cache()
         return self._ensure_csv_files()
     
-    def export_analysis_summary(self) -> str:
+    def export_analysis_summary(self, background_tasks: Optional[BackgroundTasks] = None) -> str:
         """
         Exporta un resumen del análisis a CSV.
         
+        Args:
+            background_tasks (BackgroundTasks, optional): Si se indica (desde un
+                endpoint de FastAPI), la escritura de los CSV se encola y se
+                ejecuta después de enviar la respuesta
+        
         Returns:
             str: Ruta del archivo exportado
         """
@@ -491,26 +853,29 @@ class EmotionalDataAnalyzer:
             print("❌ No hay datos suficientes para generar resumen")
             return ""
         
+        # Promedios y conteos calculados en una sola llamada cada uno
+        means = user_analysis[[
+            'avg_mood', 'avg_wellness', 'avg_anxiety', 'avg_sleep',
+            'avg_social', 'avg_energy', 'avg_stress', 'avg_hopeful'
+        ]].mean()
+        trend_counts = user_analysis['mood_trend'].value_counts()
+        
         # Crear resumen agregado
         summary = {
             'total_usuarios': len(user_analysis),
-            'usuarios_alto_riesgo': len(user_analysis[
-                (user_analysis['avg_wellness'] <= 6.0) |
-                (user_analysis['crisis_rate'] >= 30) |
-                (user_analysis['avg_hopeful'] <= 2)
-            ]),
-            'promedio_mood': user_analysis['avg_mood'].mean(),
-            'promedio_wellness': user_analysis['avg_wellness'].mean(),
-            'promedio_ansiedad': user_analysis['avg_anxiety'].mean(),
-            'promedio_sueno': user_analysis['avg_sleep'].mean(),
-            'promedio_social': user_analysis['avg_social'].mean(),
-            'promedio_energia': user_analysis['avg_energy'].mean(),
-            'promedio_estres': user_analysis['avg_stress'].mean(),
-            'promedio_esperanza': user_analysis['avg_hopeful'].mean(),
+            'usuarios_alto_riesgo': int(self._high_risk_mask(user_analysis).sum()),
+            'promedio_mood': means['avg_mood'],
+            'promedio_wellness': means['avg_wellness'],
+            'promedio_ansiedad': means['avg_anxiety'],
+            'promedio_sueno': means['avg_sleep'],
+            'promedio_social': means['avg_social'],
+            'promedio_energia': means['avg_energy'],
+            'promedio_estres': means['avg_stress'],
+            'promedio_esperanza': means['avg_hopeful'],
             'total_crisis': user_analysis['crisis_count'].sum(),
-            'usuarios_trend_mejorando': len(user_analysis[user_analysis['mood_trend'] == 'mejorando']),
-            'usuarios_trend_empeorando': len(user_analysis[user_analysis['mood_trend'] == 'empeorando']),
-            'usuarios_trend_estable': len(user_analysis[user_analysis['mood_trend'] == 'estable']),
+            'usuarios_trend_mejorando': int(trend_counts.get('mejorando', 0)),
+            'usuarios_trend_empeorando': int(trend_counts.get('empeorando', 0)),
+            'usuarios_trend_estable': int(trend_counts.get('estable', 0)),
         }
         
         summary_df = pd.DataFrame([summary])
@@ -520,15 +885,41 @@ class EmotionalDataAnalyzer:
             f"resumen_analisis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
         )
         
-        summary_df.to_csv(export_file, index=False)
-        user_analysis.to_csv(
-            export_file.replace('resumen_', 'detalle_usuarios_'),
-            index=False
-        )
+        exports = [
+            (summary_df, export_file),
+            (user_analysis, export_file.replace('resumen_', 'detalle_usuarios_'))
+        ]
         
-        print(f"✅ Resumen exportado a: {export_file}")
+        if background_tasks is not None:
+            background_tasks.add_task(self._write_csv_batch, exports)
+            print(f"⏳ Exportación del resumen programada en: {export_file}")
+        else:
+            self._write_csv_batch(exports)
+            print(f"✅ Resumen exportado a: {export_file}")
         return export_file
     
+    @staticmethod
+    def _write_csv_batch(exports: List[Tuple[pd.DataFrame, str]]) -> None:
+        """
+        Escribe varios DataFrames a CSV con un búfer grande por archivo,
+        de modo que cada uno se vuelca al disco en pocas llamadas de escritura.
+        
+        Args:
+            exports (list): Pares (DataFrame, ruta de destino)
+        """
+        for df, path in exports:
+            with open(path, 'w', encoding='utf-8', newline='', buffering=1 << 20) as f:
+                df.to_csv(f, index=False)
+    
+    @staticmethod
+    def _orjson_default(obj: Any) -> Any:
+        """Convierte los tipos de pandas que orjson no reconoce (Timestamp, NaT)."""
+        if obj is pd.NaT:
+            return None
+        if isinstance(obj, pd.Timestamp):
+            return obj.to_pydatetime()
+        raise TypeError(f"Tipo no serializable: {type(obj)}")
+    
     def convert_numpy(self, obj):
         if isinstance(obj, np.generic):
             return obj.item()  # Convierte np.float64 -> float, np.int64 -> int, etc.
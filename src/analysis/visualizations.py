@@ -3,20 +3,36 @@ Generador de visualizaciones.
 Crea gráficos y dashboards para análisis de datos emocionales.
 """
 
+import matplotlib
+matplotlib.use('Agg', force=True)  # Backend sin interfaz gráfica: solo se generan archivos
+matplotlib.interactive(False)  # Sin redibujado automático tras cada llamada de pyplot
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from PIL import Image
 import matplotlib.dates as mdates
 import matplotlib.colors as mcolors
-import seaborn as sns
+from matplotlib.cm import ScalarMappable
+from cycler import cycler
 import pandas as pd
 import numpy as np
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 import os
 import math
+import multiprocessing
+import argparse
+import functools
+import io
+import logging
 import textwrap
+from concurrent.futures import ProcessPoolExecutor
+from itertools import zip_longest
 from datetime import datetime
 
 from .data_analyzer import EmotionalDataAnalyzer
 
+logger = logging.getLogger(__name__)
+
 # Agregar el directorio raíz al path para permitir importaciones absolutas
 #import sys
 #root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -24,6 +40,58 @@ from .data_analyzer import EmotionalDataAnalyzer
 #    sys.path.append(root_dir)
 #from src.analysis.data_analyzer import EmotionalDataAnalyzer
 
+# Colores base (RGBA) para barras por encima / por debajo del umbral de bienestar
+_RGBA_GREEN = np.array(mcolors.to_rgba("green"))
+_RGBA_RED = np.array(mcolors.to_rgba("red"))
+
+
+# Datos que heredan los procesos creados con 'fork' (copy-on-write), sin serializarlos
+_SHARED_DATA: Optional[Tuple[pd.DataFrame, pd.DataFrame]] = None
+
+
+def _styled(method):
+    """
+    Decorador para los métodos de dibujo: aplica el estilo 'seaborn-v0_8'
+    (incluido en matplotlib) y los parámetros `_rc` del generador solo durante
+    la llamada, sin alterar los rcParams globales del proceso.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with plt.style.context('seaborn-v0_8'), plt.rc_context(self._rc):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _render_plot(analyzer_config: Dict[str, Any], generator_config: Dict[str, Any],
+                data: Optional[Tuple[pd.DataFrame, pd.DataFrame]], method_name: str,
+                run_ts: str) -> str:
+    """
+    Genera un gráfico en un proceso independiente.
+    
+    Reconstruye el analizador y el generador con los datos ya cargados, de modo
+    que el proceso no vuelve a leer los archivos ni la base de datos.
+    
+    Args:
+        analyzer_config (dict): Argumentos para crear el EmotionalDataAnalyzer
+        generator_config (dict): Argumentos para crear el VisualizationGenerator
+        data (tuple, optional): (users_df, surveys_df) del proceso principal; None
+            si el proceso se creó con 'fork' y los hereda en `_SHARED_DATA`
+        method_name (str): Nombre del método `create_*` a ejecutar
+        run_ts (str): Marca de tiempo de la ejecución para los nombres de archivo
+        
+    Returns:
+        str: Ruta del archivo generado ("" si no se generó)
+    """
+    if data is None:
+        data = _SHARED_DATA
+    analyzer = EmotionalDataAnalyzer(**analyzer_config)
+    analyzer._data_cache = data
+    generator = VisualizationGenerator(analyzer=analyzer, **generator_config)
+    generator._cache['data'] = data
+    generator._run_ts = run_ts
+    return getattr(generator, method_name)()
+
+
 class VisualizationGenerator:
     """
     Generador de visualizaciones para análisis emocional.
@@ -35,13 +103,39 @@ class VisualizationGenerator:
     # Constantes para etiquetas
     LABEL_BIENESTAR = 'Puntuación de Bienestar'
     UMBRAL_RIESGO = 3.0  # Umbral de riesgo para el bienestar
+    MAX_PIE_SLICES = 8  # Porciones máximas por torta; el resto se agrupa en 'Otros'
     
     # Formatos de imagen soportados
     SUPPORTED_FORMATS = ['png', 'jpg', 'jpeg', 'svg', 'pdf']
     
+    # Gráficos independientes que se pueden generar en paralelo
+    ALL_PLOTS = [
+        'create_mood_distribution_plot',
+        'create_trend_analysis_plot',
+        'create_gender_analysis_plot',
+        'create_correlation_heatmap',
+        'create_risk_analysis_plot',
+        'create_user_context_analysis',
+        'create_avg_emotional_state_by_context'
+    ]
+    
+    # Nombre de cada gráfico en el resumen, según el prefijo de su archivo
+    PLOT_TITLES = {
+        'mood_distribution': "Distribución de estados de ánimo",
+        'trend_analysis': "Análisis de tendencias",
+        'gender_analysis': "Análisis por género",
+        'correlation_heatmap': "Matriz de correlaciones",
+        'risk_analysis': "Análisis de riesgo",
+        'context_analysis': "Análisis por contexto",
+        'avg_emotional_state_by_context': "Análisis estado emocional promedio por contexto"
+    }
+    
     def __init__(self, analyzer: Optional[EmotionalDataAnalyzer] = None,
                 output_path: str = "data/exports",
-                output_format: str = "png"):
+                output_format: str = "png",
+                dpi: int = 150,
+                png_compress_level: int = 3,
+                fast_png: bool = False):
         """
         Inicializa el generador de visualizaciones.
         
@@ -49,26 +143,265 @@ class VisualizationGenerator:
             analyzer (EmotionalDataAnalyzer, optional): Analizador de datos
             output_path (str): Ruta para guardar las visualizaciones
             output_format (str): Formato de salida para las imágenes ('png', 'jpg', 'svg', 'pdf')
+            dpi (int): Resolución para formatos de mapa de bits (png, jpg). 150 dpi
+                es suficiente en pantalla y el tiempo de savefig crece con dpi²;
+                use 300 para impresión. Los formatos vectoriales no la usan
+            png_compress_level (int): Nivel de compresión zlib para PNG (0-9).
+                El nivel 3 codifica varias veces más rápido que el 6 por defecto
+                a cambio de archivos algo más grandes
+            fast_png (bool): Codifica los PNG directamente desde el búfer de Agg
+                (RGB, compresión zlib 1) sin pasar por savefig. Pensado para
+                exportaciones intermedias donde importa más el tiempo que el tamaño
         """
         self.analyzer = analyzer or EmotionalDataAnalyzer()
         self.output_path = output_path
         self.context_colors = {}  # Se inicializará con los datos
+        self._cache: Dict[str, Any] = {}  # Datos compartidos entre gráficos
+        self._figures: Dict[str, Figure] = {}  # Figuras reutilizadas por forma
+        self._label_cache: Dict[Tuple[Tuple[str, ...], int], List[str]] = {}  # Etiquetas envueltas
+        # Marca de tiempo común a los archivos de una misma ejecución
+        self._run_ts = datetime.now().strftime('%Y%m%d_%H%M%S')
         
         # Validar y establecer formato de salida
         output_format = output_format.lower().strip('.')
         if output_format not in self.SUPPORTED_FORMATS:
             raise ValueError(f"Formato no soportado. Use uno de: {', '.join(self.SUPPORTED_FORMATS)}")
         self.output_format = output_format
-        
-        # Configurar estilo de matplotlib
-        plt.style.use('seaborn-v0_8')
-        sns.set_palette("husl")
-        plt.rcParams['figure.figsize'] = (12, 8)
-        plt.rcParams['font.size'] = 10
+        # Solo los formatos de mapa de bits dependen de la resolución
+        self.dpi = dpi
+        self.png_compress_level = png_compress_level
+        self.fast_png = fast_png and output_format == 'png'
+        # Argumentos comunes de savefig para todos los gráficos
+        self._savefig_kwargs: Dict[str, Any] = {'format': output_format}
+        if output_format in ('png', 'jpg', 'jpeg'):
+            self._savefig_kwargs['dpi'] = dpi
+        if output_format == 'png':
+            self._savefig_kwargs['pil_kwargs'] = {'compress_level': png_compress_level}
+        
+        # Parámetros de estilo propios; se aplican solo mientras se dibuja
+        # (ver `_styled`) sin modificar el estado global de matplotlib
+        self._rc = {
+            'axes.prop_cycle': cycler(color=self._palette(6)),
+            'figure.figsize': (12, 8),
+            'font.size': 10,
+            # Simplificar trazos casi colineales y dibujar líneas largas por tramos
+            'path.simplify': True,
+            'path.simplify_threshold': 1.0,
+            'agg.path.chunksize': 10000,
+            # Resolución de los elementos rasterizados dentro de SVG/PDF
+            'savefig.dpi': dpi,
+            # SVG: texto como <text> en lugar de un trazo por glifo, e ids
+            # deterministas para que el mismo gráfico produzca el mismo archivo
+            'svg.fonttype': 'none',
+            'svg.hashsalt': 'feel-your-emotions'
+        }
         
         # Crear directorio de salida
         os.makedirs(output_path, exist_ok=True)
         
+    def _get_data(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Devuelve (users_df, surveys_df) cargados una sola vez por generador,
+        de modo que todos los gráficos de un dashboard comparten los mismos datos.
+        
+        Returns:
+            Tuple[pd.DataFrame, pd.DataFrame]: DataFrames de usuarios y encuestas
+        """
+        if 'data' not in self._cache:
+            self._cache['data'] = self.analyzer.load_data()
+        return self._cache['data']
+    
+    def _get_analysis(self, method_name: str) -> Any:
+        """
+        Devuelve el resultado de un análisis del analizador (sin argumentos),
+        calculado una sola vez por generador.
+        
+        Args:
+            method_name (str): Nombre del método del analizador, p. ej.
+                'analyze_correlations'
+            
+        Returns:
+            Any: Resultado del análisis
+        """
+        if method_name not in self._cache:
+            self._cache[method_name] = getattr(self.analyzer, method_name)()
+        return self._cache[method_name]
+    
+    def _attach_context(self, surveys_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Añade a las encuestas el contexto de su usuario.
+        
+        El índice user_id -> contexto se construye una vez por generador y
+        se consulta por hash, sin construir un DataFrame combinado con merge.
+        
+        Args:
+            surveys_df (pd.DataFrame): Encuestas con columna 'user_id'
+            
+        Returns:
+            pd.DataFrame: Copia de las encuestas con la columna 'context'
+        """
+        user_context = self._cache.get('user_context')
+        if user_context is None:
+            users_df, _ = self._get_data()
+            user_context = users_df.set_index('user_id')['context'].astype('category')
+            self._cache['user_context'] = user_context
+        return surveys_df.assign(context=user_context.reindex(surveys_df['user_id']).values)
+    
+    def _get_surveys_with_context(self) -> pd.DataFrame:
+        """
+        Devuelve las encuestas con el contexto del usuario, calculadas una sola
+        vez por generador y compartidas por los gráficos de riesgo y contexto.
+        
+        Returns:
+            pd.DataFrame: Encuestas con la columna 'context' (solo lectura)
+        """
+        if 'surveys_ctx' not in self._cache:
+            _, surveys_df = self._get_data()
+            self._cache['surveys_ctx'] = self._attach_context(surveys_df)
+        return self._cache['surveys_ctx']
+    
+    def _get_figure(self, key: str, figsize: tuple, layout: str = 'constrained') -> Figure:
+        """
+        Devuelve una figura reutilizable para el tamaño indicado, ya vacía.
+        
+        Las figuras se crean fuera de pyplot (sin gestor de ventanas) y se
+        limpian con `clear()` tras guardarse, en lugar de crear y destruir
+        una figura nueva por gráfico. Por defecto usan el diseño 'constrained',
+        que se resuelve durante el propio dibujado en vez de requerir una
+        pasada de medición extra con `tight_layout()`.
+        
+        Args:
+            key (str): Identificador de la forma de la figura (p. ej. '2x2')
+            figsize (tuple): Tamaño de la figura en pulgadas
+            layout (str): Motor de diseño ('constrained' o 'none' para ajustar
+                los márgenes a mano)
+            
+        Returns:
+            Figure: Figura vacía lista para dibujar
+        """
+        fig = self._figures.get(key)
+        if fig is None:
+            fig = self._figures[key] = Figure(figsize=figsize)
+        else:
+            fig.clear()
+        fig.set_layout_engine(layout)
+        return fig
+    
+    def _wrap(self, labels, width: int) -> List[str]:
+        """
+        Envuelve etiquetas largas en varias líneas, memorizando el resultado.
+        
+        Los mismos contextos se etiquetan en varios paneles, así que cada
+        conjunto de etiquetas se procesa con `textwrap` una sola vez.
+        
+        Args:
+            labels: Etiquetas a envolver
+            width (int): Ancho máximo de cada línea
+            
+        Returns:
+            List[str]: Etiquetas envueltas
+        """
+        key = (tuple(str(label) for label in labels), width)
+        wrapped = self._label_cache.get(key)
+        if wrapped is None:
+            wrapped = [textwrap.fill(label, width=width, break_long_words=False) for label in key[0]]
+            self._label_cache[key] = wrapped
+        return wrapped
+    
+    def _categorical(self, ax, counts: pd.Series, labels, width: int = 15,
+                     colors=None, **pie_kwargs):
+        """
+        Dibuja la distribución de una variable categórica como gráfico de torta.
+        Con más de `MAX_PIE_SLICES` categorías se muestran las más frecuentes y
+        el resto se agrupa en una porción 'Otros' (las porciones pequeñas no se
+        distinguen y cada una añade artistas y etiquetas que maquetar).
+        
+        Args:
+            ax: Ejes de matplotlib donde dibujar
+            counts (pd.Series): Conteos por categoría
+            labels: Etiquetas a mostrar para cada categoría
+            width (int): Ancho de envoltura de las etiquetas de la torta
+            colors: Colores por categoría (opcional)
+            **pie_kwargs: Argumentos adicionales para `ax.pie`
+            
+        Returns:
+            Tuple: (texts, autotexts) de la torta
+        """
+        values = counts.to_numpy()
+        labels = list(labels)
+        if len(values) > self.MAX_PIE_SLICES:
+            # Índices de las K-1 categorías más frecuentes, en orden descendente
+            top = np.argsort(-values, kind='stable')[:self.MAX_PIE_SLICES - 1]
+            others = values.sum() - values[top].sum()
+            values = np.append(values[top], others)
+            labels = [labels[i] for i in top] + ['Otros']
+            if colors is not None:
+                colors = [colors[i] for i in top] + ['#CCCCCC']
+        _, texts, autotexts = ax.pie(
+            values,
+            labels=self._wrap(labels, width),
+            colors=colors,
+            autopct='%1.1f%%',
+            startangle=90,
+            **pie_kwargs
+        )
+        return texts, autotexts
+    
+    def _save_figure(self, fig, filepath: str, **kwargs) -> None:
+        """
+        Renderiza la figura en memoria y la escribe en disco de una sola vez,
+        en lugar de las múltiples escrituras pequeñas del codificador.
+        
+        Args:
+            fig: Figura de matplotlib a guardar
+            filepath (str): Ruta del archivo de salida
+            **kwargs: Argumentos adicionales para `savefig` (p. ej. bbox_inches)
+        """
+        buffer = io.BytesIO()
+        if self.fast_png and not kwargs:
+            self._encode_png(fig, buffer)
+        else:
+            fig.savefig(buffer, **self._savefig_kwargs, **kwargs)
+        with open(filepath, 'wb') as f:
+            f.write(buffer.getbuffer())
+    
+    def _encode_png(self, fig, buffer: io.BytesIO) -> None:
+        """
+        Renderiza la figura con Agg y codifica el búfer RGB con Pillow a
+        compresión 1, evitando el canal alfa y la pasada extra de savefig.
+        
+        Args:
+            fig: Figura de matplotlib a guardar
+            buffer (io.BytesIO): Destino de los bytes PNG
+        """
+        if not isinstance(fig.canvas, FigureCanvasAgg):
+            FigureCanvasAgg(fig)
+        fig.set_dpi(self.dpi)
+        fig.canvas.draw()
+        rgba = np.asarray(fig.canvas.buffer_rgba())
+        Image.fromarray(rgba[..., :3]).save(
+            buffer, format='PNG', compress_level=1, dpi=(self.dpi, self.dpi)
+        )
+    
+    def clear_cache(self) -> None:
+        """Descarta los datos en caché del generador y del analizador."""
+        self._cache.clear()
+        self.analyzer.invalidate_cache()
+    
+    @staticmethod
+    def _palette(n_colors: int) -> List[tuple]:
+        """
+        Devuelve `n_colors` colores equiespaciados del mapa cíclico 'hsv'.
+        
+        Args:
+            n_colors (int): Número de colores
+            
+        Returns:
+            List[tuple]: Colores RGBA
+        """
+        # endpoint=False: 'hsv' es cíclico y el último color repetiría el primero
+        return [tuple(c) for c in matplotlib.colormaps['hsv'](np.linspace(0, 1, n_colors, endpoint=False))]
+    
     def _initialize_color_palette(self, contexts):
         """
         Inicializa una paleta de colores para los contextos existentes.
@@ -79,10 +412,63 @@ class VisualizationGenerator:
         if not self.context_colors:  # Solo inicializar si no existe
             # Usar una paleta de colores suave pero distintiva
             n_colors = len(contexts)
-            colors = sns.color_palette("husl", n_colors)
+            colors = self._palette(n_colors)
             # Asegurar que los colores sean suficientemente diferentes
             self.context_colors = dict(zip(sorted(contexts), colors))
     
+    @staticmethod
+    def _plot_histogram(ax, series: pd.Series, bins: int, color: str) -> np.ndarray:
+        """
+        Dibuja un histograma calculando los intervalos con numpy y pintándolo
+        como un único escalonado relleno (`ax.stairs`) en lugar de un
+        rectángulo por intervalo.
+        
+        Args:
+            ax: Ejes de matplotlib donde dibujar
+            series (pd.Series): Valores a representar (se ignoran los NaN)
+            bins (int): Número de intervalos
+            color (str): Color de las barras
+            
+        Returns:
+            np.ndarray: Valores válidos usados en el histograma
+        """
+        values = series.to_numpy(dtype=np.float32)
+        values = values[~np.isnan(values)]
+        if values.size:
+            counts, edges = np.histogram(values, bins=bins)
+            ax.stairs(counts, edges, fill=True, alpha=0.7, color=color)
+        return values
+    
+    @staticmethod
+    def _plot_score_counts(ax, series: pd.Series, color: str,
+                           low: int = 1, high: int = 5) -> Optional[float]:
+        """
+        Dibuja la frecuencia de una puntuación entera (p. ej. 1-5) contando con
+        `np.bincount`, una sola pasada sin calcular intervalos.
+        
+        Args:
+            ax: Ejes de matplotlib donde dibujar
+            series (pd.Series): Puntuaciones (se ignoran los NaN)
+            color (str): Color de las barras
+            low (int): Puntuación mínima
+            high (int): Puntuación máxima
+            
+        Returns:
+            Optional[float]: Promedio calculado a partir de los conteos, o None
+            si los valores no son enteros dentro del rango (no se dibuja nada)
+        """
+        values = series.to_numpy(dtype=np.float32)
+        values = values[~np.isnan(values)]
+        if (values.size == 0 or values.min() < low or values.max() > high
+                or not np.array_equal(values, np.round(values))):
+            return None
+        scores = np.arange(low, high + 1)
+        counts = np.bincount(values.astype(np.int64), minlength=high + 1)[low:high + 1]
+        ax.bar(scores, counts, width=0.9, align='center', alpha=0.7, color=color)
+        ax.set_xticks(scores)
+        return float((scores * counts).sum() / counts.sum())
+    
+    @_styled
     def create_mood_distribution_plot(self) -> str:
         """
         Crea un gráfico de distribución de estados de ánimo.
@@ -90,52 +476,55 @@ class VisualizationGenerator:
         Returns:
             str: Ruta del archivo generado
         """
-        users_df, surveys_df = self.analyzer.load_data()
+        _, surveys_df = self._get_data()
         
         if surveys_df.empty:
             print("❌ No hay datos de encuestas para visualizar")
             return ""
         
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
+        fig = self._get_figure('1x2', (15, 6))
+        ax1, ax2 = fig.subplots(1, 2)
         
         # Distribución de mood
         if 'mood' in surveys_df.columns:
-            surveys_df['mood'].hist(bins=5, ax=ax1, alpha=0.7, color='skyblue')
+            # El ánimo es un entero 1-5: conteo directo; si no, histograma genérico
+            mean_mood = self._plot_score_counts(ax1, surveys_df['mood'], color='skyblue')
+            if mean_mood is None:
+                mood = self._plot_histogram(ax1, surveys_df['mood'], bins=5, color='skyblue')
+                mean_mood = float(mood.mean()) if mood.size else np.nan
             ax1.set_title('Distribución de Estados de Ánimo', fontsize=18)
             ax1.set_xlabel('Puntuación de Ánimo (1-5)')
             ax1.set_ylabel('Frecuencia')
             ax1.grid(True, alpha=0.3)
             
             # Añadir línea de promedio
-            mean_mood = surveys_df['mood'].mean()
             ax1.axvline(mean_mood, color='red', linestyle='--', 
                     label=f'Promedio: {mean_mood:.1f}')
             ax1.legend()
         
         # Distribución de wellness_score
         if 'wellness_score' in surveys_df.columns:
-            surveys_df['wellness_score'].hist(bins=10, ax=ax2, alpha=0.7, color='lightgreen')
+            wellness = self._plot_histogram(ax2, surveys_df['wellness_score'], bins=10, color='lightgreen')
             ax2.set_title('Distribución de Puntuaciones de Bienestar', fontsize=18)
             ax2.set_xlabel('Puntuación de Bienestar (1-5)')
             ax2.set_ylabel('Frecuencia')
             ax2.grid(True, alpha=0.3)
             
             # Añadir línea de promedio
-            mean_wellness = surveys_df['wellness_score'].mean()
+            mean_wellness = float(wellness.mean()) if wellness.size else np.nan
             ax2.axvline(mean_wellness, color='red', linestyle='--',
                     label=f'Promedio: {mean_wellness:.1f}')
             ax2.legend()
         
-        plt.tight_layout()
-        
-        filename = f"mood_distribution_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{self.output_format}"
+        filename = f"mood_distribution_{self._run_ts}.{self.output_format}"
         filepath = os.path.join(self.output_path, filename)
-        plt.savefig(filepath, dpi=300, bbox_inches='tight', format=self.output_format)
-        plt.close()
+        self._save_figure(fig, filepath)
+        fig.clear()  # Se reutiliza la figura en el siguiente gráfico
         
         print(f"✅ Gráfico de distribución guardado: {filepath}")
         return filepath
     
+    @_styled
     def create_trend_analysis_plot(self, days: int = 30) -> str:
         """
         Crea un gráfico de análisis de tendencias temporales.
@@ -153,20 +542,23 @@ class VisualizationGenerator:
             print("❌ No hay datos suficientes para análisis de tendencias")
             return ""
         
-        fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+        fig = self._get_figure('2x2', (16, 12))
+        # Los cuatro paneles usan las mismas fechas: eje X compartido, con las
+        # etiquetas de fecha dibujadas solo en la fila inferior
+        axes = fig.subplots(2, 2, sharex=True)
         
-        # Convertir fecha a datetime para mejor visualización
-        trends_df['date'] = pd.to_datetime(trends_df['date'])
-        print(f"trends_df:\n{trends_df}")
+        # Convertir fecha a datetime para mejor visualización (formato explícito:
+        # el analizador entrega días 'YYYY-MM-DD', no hace falta inferirlo)
+        if not pd.api.types.is_datetime64_any_dtype(trends_df['date']):
+            trends_df['date'] = pd.to_datetime(trends_df['date'], format='%Y-%m-%d', cache=True)
+        logger.debug("trends_df:\n%s", trends_df)
         # Gráfico 1: Tendencia de ánimo promedio
         if 'mood_mean' in trends_df.columns:
             axes[0, 0].plot(trends_df['date'], trends_df['mood_mean'], 
                            marker='o', linewidth=2, color='blue')
             axes[0, 0].set_title('Tendencia del Estado de Ánimo Promedio', fontsize=18)
             axes[0, 0].set_ylabel('Ánimo Promedio (1-5)')
-            axes[0, 0].xaxis.set_major_formatter(mdates.DateFormatter(date_format))
             axes[0, 0].grid(True, alpha=0.3)
-            axes[0, 0].tick_params(axis='x', rotation=90)
         
         # Gráfico 2: Tendencia de bienestar promedio
         if 'wellness_score_mean' in trends_df.columns:
@@ -174,9 +566,7 @@ class VisualizationGenerator:
                            marker='s', linewidth=2, color='green')
             axes[0, 1].set_title('Tendencia del Bienestar Promedio', fontsize=18)
             axes[0, 1].set_ylabel('Bienestar Promedio (1-5)')
-            axes[0, 1].xaxis.set_major_formatter(mdates.DateFormatter(date_format))
             axes[0, 1].grid(True, alpha=0.3)
-            axes[0, 1].tick_params(axis='x', rotation=90)
         
         # Gráfico 3: Número de encuestas por día
         if 'mood_count' in trends_df.columns:
@@ -184,8 +574,6 @@ class VisualizationGenerator:
                           alpha=0.7, color='orange')
             axes[1, 0].set_title('Número de Encuestas por Día', fontsize=18)
             axes[1, 0].set_ylabel('Número de Encuestas')
-            axes[1, 0].xaxis.set_major_formatter(mdates.DateFormatter(date_format))
-            axes[1, 0].tick_params(axis='x', rotation=90)
         
         # Gráfico 4: Alertas de crisis por día
         if 'crisis_alert_sum' in trends_df.columns:
@@ -193,19 +581,22 @@ class VisualizationGenerator:
                           alpha=0.7, color='red')
             axes[1, 1].set_title('Alertas de Crisis por Día', fontsize=18)
             axes[1, 1].set_ylabel('Número de Alertas')
-            axes[1, 1].xaxis.set_major_formatter(mdates.DateFormatter(date_format))
-            axes[1, 1].tick_params(axis='x', rotation=90)
         
-        plt.tight_layout()
+        # Eje X compartido: el formateador de fechas es común a los cuatro paneles
+        # y solo la fila inferior muestra etiquetas que haya que rotar
+        axes[1, 0].xaxis.set_major_formatter(mdates.DateFormatter(date_format))
+        for ax in axes[1]:
+            ax.tick_params(axis='x', labelrotation=90)
         
-        filename = f"trend_analysis_{days}days_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{self.output_format}"
+        filename = f"trend_analysis_{days}days_{self._run_ts}.{self.output_format}"
         filepath = os.path.join(self.output_path, filename)
-        plt.savefig(filepath, dpi=300, bbox_inches='tight', format=self.output_format)
-        plt.close()
+        self._save_figure(fig, filepath)
+        fig.clear()  # Se reutiliza la figura en el siguiente gráfico
         
         print(f"✅ Gráfico de tendencias guardado: {filepath}")
         return filepath
     
+    @_styled
     def create_gender_analysis_plot(self) -> str:
         """
         Crea visualizaciones específicas de análisis por género.
@@ -213,31 +604,26 @@ class VisualizationGenerator:
         Returns:
             str: Ruta del archivo generado
         """
-        users_df, surveys_df = self.analyzer.load_data()
+        users_df, surveys_df = self._get_data()
         gender_analysis = self.analyzer.analyze_gender_patterns()
         
         if users_df.empty or 'gender' not in users_df.columns:
             print("❌ No hay datos suficientes para análisis por género")
             return ""
         
-        fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+        fig = self._get_figure('2x2', (16, 12))
+        axes = fig.subplots(2, 2)
         
         # Gráfico 1: Distribución por género
         gender_counts = pd.Series(gender_analysis['distribution'])
-        gender_labels = [textwrap.fill(str(label), width=15) for label in gender_counts.index]
-        _, texts, autotexts = axes[0, 0].pie(
-            gender_counts.values,
-            labels=gender_labels,
-            colors=plt.cm.Set3(np.linspace(0, 1, len(gender_counts))),
-            autopct='%1.1f%%',
-            startangle=90
-        )
+        self._categorical(axes[0, 0], gender_counts, gender_counts.index,
+                          colors=plt.cm.Set3(np.linspace(0, 1, len(gender_counts))))
         axes[0, 0].set_title('Distribución por Género', fontsize=18)
         
         # Gráfico 2: Edad promedio por género
         if 'age_by_gender' in gender_analysis:
             age_data = pd.DataFrame(gender_analysis['age_by_gender']).T
-            print(f"age_data:\n{age_data}")
+            logger.debug("age_data:\n%s", age_data)
             ax = age_data['mean'].plot(
                 kind='bar',
                 #yerr=age_data['max'] - age_data['min'],
@@ -255,10 +641,11 @@ class VisualizationGenerator:
         # Gráfico 3: Bienestar promedio por género
         if 'wellness_by_gender' in gender_analysis:
             wellness_data = pd.DataFrame(gender_analysis['wellness_by_gender'])
-            wellness_metrics = pd.DataFrame({
-                'Bienestar': wellness_data.loc['wellness_score', 'mean'],
-                'Estado de Ánimo': wellness_data.loc['mood', 'mean']
-            })
+            wellness_metrics = (
+                wellness_data.loc[(['wellness_score', 'mood'], 'mean'), :]
+                .droplevel(1).T
+                .rename(columns={'wellness_score': 'Bienestar', 'mood': 'Estado de Ánimo'})
+            )
             ax = wellness_metrics.plot(
                 kind='bar',
                 ax=axes[1, 0],
@@ -274,11 +661,11 @@ class VisualizationGenerator:
         # Gráfico 4: Tasa de crisis por género
         if 'crisis_by_gender' in gender_analysis:
             crisis_data = pd.DataFrame(gender_analysis['crisis_by_gender'])
-            print(f"crisis_data: \n{crisis_data}")
+            logger.debug("crisis_data:\n%s", crisis_data)
             if 'users_with_crisis' in crisis_data.columns:
-                crisis_rate = (crisis_data['total_users'] / 
-                            crisis_data['users_with_crisis'] * 100).round(1)
-                print(f"crisis_rate: \n{crisis_rate}")
+                crisis_rate = (crisis_data['users_with_crisis'] /
+                               crisis_data['total_users'] * 100).round(1)
+                logger.debug("crisis_rate:\n%s", crisis_rate)
                 ax = crisis_rate.plot(
                     kind='bar',
                     ax=axes[1, 1],
@@ -290,16 +677,15 @@ class VisualizationGenerator:
                 for container in ax.containers:
                     ax.bar_label(container, fmt='%.2f', label_type='edge', padding=3)
         
-        plt.tight_layout()
-        
-        filename = f"gender_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{self.output_format}"
+        filename = f"gender_analysis_{self._run_ts}.{self.output_format}"
         filepath = os.path.join(self.output_path, filename)
-        plt.savefig(filepath, dpi=300, bbox_inches='tight', format=self.output_format)
-        plt.close()
+        self._save_figure(fig, filepath)
+        fig.clear()  # Se reutiliza la figura en el siguiente gráfico
         
         print(f"✅ Análisis por género guardado: {filepath}")
         return filepath
         
+    @_styled
     def create_correlation_heatmap(self) -> str:
         """
         Crea un mapa de calor de correlaciones entre indicadores emocionales.
@@ -307,13 +693,14 @@ class VisualizationGenerator:
         Returns:
             str: Ruta del archivo generado
         """
-        correlation_matrix = self.analyzer.analyze_correlations()
+        correlation_matrix = self._get_analysis('analyze_correlations')
         
         if correlation_matrix.empty:
             print("❌ No hay datos suficientes para análisis de correlaciones")
             return ""
         
-        plt.figure(figsize=(12, 10))
+        fig = self._get_figure('heatmap', (12, 10))
+        ax = fig.subplots()
         
         # Renombrar columnas para mejor visualización
         column_labels = {
@@ -327,30 +714,36 @@ class VisualizationGenerator:
             'wellness_score': 'Bienestar'
         }
         
-        correlation_matrix = correlation_matrix.rename(columns=column_labels)
-        correlation_matrix = correlation_matrix.rename(index=column_labels)
+        correlation_matrix = correlation_matrix.rename(index=column_labels, columns=column_labels)
+        
+        # Crear mapa de calor con imshow: una sola imagen en lugar de una malla de celdas
+        values = correlation_matrix.to_numpy(dtype=np.float32)
+        im = ax.imshow(values, cmap='RdBu_r', vmin=-1, vmax=1, aspect='equal')
+        fig.colorbar(im, ax=ax, shrink=0.8)
+        ax.set_xticks(range(len(correlation_matrix.columns)))
+        ax.set_xticklabels(correlation_matrix.columns, rotation=45, ha='right')
+        ax.set_yticks(range(len(correlation_matrix.index)))
+        ax.set_yticklabels(correlation_matrix.index)
+        ax.grid(False)
         
-        # Crear mapa de calor
-        sns.heatmap(correlation_matrix, 
-                    annot=True, 
-                    cmap='RdBu_r', 
-                    center=0,
-                    square=True,
-                    fmt='.2f',
-                    cbar_kws={'shrink': 0.8})
+        # Anotaciones: texto claro sobre los colores más intensos
+        for i, j in zip(*np.nonzero(~np.isnan(values))):
+            v = values[i, j]
+            ax.text(j, i, f'{v:.2f}', ha='center', va='center',
+                    color='white' if abs(v) > 0.5 else 'black')
         
-        plt.title('Matriz de Correlaciones - Indicadores Emocionales', 
-                  fontsize=18, pad=20)
-        plt.tight_layout()
+        ax.set_title('Matriz de Correlaciones - Indicadores Emocionales', 
+                     fontsize=18, pad=20)
         
-        filename = f"correlation_heatmap_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{self.output_format}"
+        filename = f"correlation_heatmap_{self._run_ts}.{self.output_format}"
         filepath = os.path.join(self.output_path, filename)
-        plt.savefig(filepath, dpi=300, bbox_inches='tight', format=self.output_format)
-        plt.close()
+        self._save_figure(fig, filepath)
+        fig.clear()  # Se reutiliza la figura en el siguiente gráfico
         
         print(f"✅ Mapa de calor guardado: {filepath}")
         return filepath
     
+    @_styled
     def create_risk_analysis_plot(self) -> str:
         """
         Crea visualizaciones de análisis de riesgo.
@@ -358,17 +751,18 @@ class VisualizationGenerator:
         Returns:
             str: Ruta del archivo generado
         """
-        users_df, surveys_df = self.analyzer.load_data()
-        user_analysis = self.analyzer.analyze_user_risk_patterns()
+        users_df, surveys_df = self._get_data()
+        user_analysis = self._get_analysis('analyze_user_risk_patterns')
         
         if user_analysis.empty:
             print("❌ No hay datos de usuarios para análisis de riesgo")
             return ""
         
-        fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+        fig = self._get_figure('2x2', (16, 12))
+        axes = fig.subplots(2, 2)
         
         # Gráfico 1: Distribución de puntuaciones de bienestar
-        axes[0, 0].hist(user_analysis['avg_wellness'], bins=10, alpha=0.7, color='red')
+        self._plot_histogram(axes[0, 0], user_analysis['avg_wellness'], bins=10, color='red')
         axes[0, 0].axvline(3.0, color='darkred', linestyle='--', 
                           label='Umbral de Riesgo (3.0)')
         axes[0, 0].set_title('Distribución de Puntuaciones de Bienestar', fontsize=18)
@@ -378,27 +772,28 @@ class VisualizationGenerator:
         axes[0, 0].grid(True, alpha=0.3)
         
         # Gráfico 2: Relación entre edad y bienestar
-        scatter = axes[0, 1].scatter(user_analysis['age'], user_analysis['avg_wellness'], 
-                                    c=user_analysis['crisis_rate'], cmap='RdYlGn', alpha=0.6)
+        # Colores RGBA calculados de una vez sobre el array; la barra de color
+        # usa el mismo mapa y normalización (tasa de crisis en %)
+        crisis_norm = mcolors.Normalize(vmin=0, vmax=100)
+        crisis_cmap = matplotlib.colormaps['RdYlGn']
+        crisis_rgba = crisis_cmap(crisis_norm(user_analysis['crisis_rate'].to_numpy(dtype=np.float64)))
+        axes[0, 1].scatter(user_analysis['age'].to_numpy(), user_analysis['avg_wellness'].to_numpy(),
+                           c=crisis_rgba, alpha=0.6,
+                           rasterized=True)  # Un punto por usuario: imagen en SVG/PDF
         axes[0, 1].set_title('Relación Edad vs Bienestar', fontsize=18)
         axes[0, 1].set_xlabel('Edad')
         axes[0, 1].set_ylabel(self.LABEL_BIENESTAR)
-        plt.colorbar(scatter, ax=axes[0, 1], label='Tasa de Crisis (%)')
+        fig.colorbar(ScalarMappable(norm=crisis_norm, cmap=crisis_cmap), ax=axes[0, 1],
+                     label='Tasa de Crisis (%)', alpha=0.6)
         
         # Gráfico 3: Distribución de tendencias
         if 'mood_trend' in user_analysis.columns:
             trend_counts = user_analysis['mood_trend'].value_counts()
-            # Envolver etiquetas largas
-            wrapped_labels = [textwrap.fill(label.capitalize(), width=15, break_long_words=False) 
-                            for label in trend_counts.index]
-            # Crear gráfico de torta con etiquetas envueltas
-            wedges, texts, autotexts = axes[1, 0].pie(
-                trend_counts.values, 
-                labels=wrapped_labels,
-                autopct='%1.1f%%',
-                startangle=90,
-                pctdistance=0.85,
-                labeldistance=1.1
+            trend_counts = trend_counts[trend_counts > 0]  # Sin categorías vacías
+            # Torta con etiquetas envueltas
+            texts, autotexts = self._categorical(
+                axes[1, 0], trend_counts, trend_counts.index.str.capitalize(),
+                pctdistance=0.85, labeldistance=1.1
             )
             # Ajustar el tamaño de las etiquetas
             plt.setp(texts, size=9)
@@ -407,32 +802,29 @@ class VisualizationGenerator:
         
         # Gráfico 4: Contextos con menor bienestar
         if not surveys_df.empty and 'context' in users_df.columns:
-            surveys_with_context = surveys_df.merge(
-                users_df[['user_id', 'context']], on='user_id', how='left'
-            )
+            surveys_with_context = self._get_surveys_with_context()
             if 'wellness_score' in surveys_with_context.columns:
-                # Filtrar por bajo bienestar (menor a 3.0)
-                low_wellness = surveys_with_context[surveys_with_context['wellness_score'] < 3.0]
-                if not low_wellness.empty:
-                    print(f"low_wellness:\n{low_wellness}")
-                    context_counts = low_wellness['context'].value_counts().head(5)
-                    print(f"context_counts:{context_counts}")
-                    wrapped_labels = [textwrap.fill(label.capitalize(), width=20, break_long_words=False) 
-                            for label in context_counts.index]
+                # Filtrar por bajo bienestar con una máscara sobre la columna de
+                # contexto, sin copiar el resto de columnas de las encuestas
+                low_wellness = surveys_with_context['wellness_score'].to_numpy() < self.UMBRAL_RIESGO
+                if low_wellness.any():
+                    context_counts = surveys_with_context['context'][low_wellness].value_counts()
+                    context_counts = context_counts[context_counts > 0].head(5)
+                    logger.debug("context_counts:\n%s", context_counts)
+                    wrapped_labels = self._wrap(context_counts.index.str.capitalize(), 20)
                     axes[1, 1].barh(wrapped_labels, context_counts.values, color='orange')
                     axes[1, 1].set_title('Contextos con Menor Nivel de Bienestar')
                     axes[1, 1].set_xlabel('Número de Encuestas')
         
-        plt.tight_layout()
-        
-        filename = f"risk_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{self.output_format}"
+        filename = f"risk_analysis_{self._run_ts}.{self.output_format}"
         filepath = os.path.join(self.output_path, filename)
-        plt.savefig(filepath, dpi=300, bbox_inches='tight', format=self.output_format)
-        plt.close()
+        self._save_figure(fig, filepath)
+        fig.clear()  # Se reutiliza la figura en el siguiente gráfico
         
         print(f"✅ Análisis de riesgo guardado: {filepath}")
         return filepath
     
+    @_styled
     def create_user_context_analysis(self) -> str:
         """
         Crea análisis visual por contexto de usuarios.
@@ -440,39 +832,41 @@ class VisualizationGenerator:
         Returns:
             str: Ruta del archivo generado
         """
-        users_df, surveys_df = self.analyzer.load_data()
+        users_df, surveys_df = self._get_data()
         
         if users_df.empty:
             print("❌ No hay datos de usuarios disponibles")
             return ""
         
-        fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+        fig = self._get_figure('2x2', (16, 12))
+        # Separación extra (pulgadas) para las etiquetas envueltas y rotadas
+        fig.get_layout_engine().set(h_pad=0.3, w_pad=0.3)
+        axes = fig.subplots(2, 2)
+        
+        # Agregados de usuarios por contexto para los gráficos 1 y 2: un solo groupby
+        user_stats = pd.DataFrame()
+        if 'context' in users_df.columns:
+            aggregations = {'count': ('user_id', 'size')}
+            if 'age' in users_df.columns:
+                aggregations['age_mean'] = ('age', 'mean')
+            user_stats = users_df.groupby('context', observed=True).agg(**aggregations)
         
         # Gráfico 1: Distribución por contexto y género
         if 'context' in users_df.columns and 'gender' in users_df.columns:
-            # Panel izquierdo: Distribución por contexto
-            context_counts = users_df['context'].value_counts()
-            
-            # Panel derecho: Distribución por género
-            gender_counts = users_df['gender'].value_counts()
+            # Distribución por contexto, de mayor a menor
+            context_counts = user_stats['count'].sort_values(ascending=False, kind='stable')
             
             # Inicializar la paleta de colores si es necesario
             if not self.context_colors:
                 self._initialize_color_palette(users_df['context'].unique())
             
-            # Envolver etiquetas largas
-            wrapped_labels = [textwrap.fill(label, width=20, break_long_words=False) 
-                            for label in context_counts.index]
             # Obtener colores para cada contexto
             context_colors = [self.context_colors.get(context, '#CCCCCC') for context in context_counts.index]
             
-            # Crear gráfico de torta con etiquetas envueltas y colores consistentes
-            wedges, texts, autotexts = axes[0, 0].pie(
-                context_counts.values, 
-                labels=wrapped_labels,
+            # Torta con etiquetas envueltas y colores consistentes
+            texts, autotexts = self._categorical(
+                axes[0, 0], context_counts, context_counts.index, width=20,
                 colors=context_colors,
-                autopct='%1.1f%%', 
-                startangle=90,
                 pctdistance=0.85,  # Mover los porcentajes más hacia afuera
                 labeldistance=1.1   # Mover las etiquetas más hacia afuera
             )
@@ -483,8 +877,8 @@ class VisualizationGenerator:
         
         # Gráfico 2: Edad promedio por contexto
         if 'context' in users_df.columns and 'age' in users_df.columns:
-            context_age = users_df.groupby('context')['age'].mean()
-            print(f"context_age:\n{context_age}")
+            context_age = user_stats['age_mean']
+            logger.debug("context_age:\n%s", context_age)
             # Usar los colores ya inicializados
             context_colors = [self.context_colors.get(context, '#CCCCCC') for context in context_age.index]
             axes[0, 1].bar(range(len(context_age)), context_age.values, color=context_colors)
@@ -493,82 +887,65 @@ class VisualizationGenerator:
             # Ajustar etiquetas del eje x
             axes[0, 1].set_xticks(range(len(context_age)))
             # Envolver el texto de las etiquetas largas
-            wrapped_labels = [textwrap.fill(label, width=25, break_long_words=False) 
-                            for label in context_age.index]
-            axes[0, 1].set_xticklabels(wrapped_labels, rotation=45, ha='right')
-            # Ajustar los márgenes para las etiquetas
-            plt.setp(axes[0, 1].get_xticklabels(), fontsize=9)
+            wrapped_labels = self._wrap(context_age.index, 25)
+            axes[0, 1].set_xticklabels(wrapped_labels, rotation=45, ha='right', fontsize=9)
+        
+        # Agregados por contexto para los gráficos 3 y 4: un solo groupby
+        context_stats = pd.DataFrame()
+        if not surveys_df.empty and 'context' in users_df.columns and 'wellness_score' in surveys_df.columns:
+            surveys_with_context = self._get_surveys_with_context()
+            context_stats = surveys_with_context.groupby('context', observed=True).agg(
+                wellness=('wellness_score', 'mean'),
+                n=('user_id', 'size')
+            )
         
         # Gráfico 3: Bienestar promedio por contexto
-        if not surveys_df.empty and 'context' in users_df.columns:
-            # Combinar encuestas con contexto de usuarios
-            surveys_with_context = surveys_df.merge(
-                users_df[['user_id', 'context']], on='user_id', how='left'
-            )
-            if 'wellness_score' in surveys_with_context.columns:
-                context_wellness = surveys_with_context.groupby('context')['wellness_score'].mean()
-                print(f"context_wellness\n{context_wellness}")
-                # Usar los colores ya inicializados
-                context_colors = [self.context_colors.get(context, '#CCCCCC') for context in context_wellness.index]
-                bars = axes[1, 0].bar(range(len(context_wellness)), context_wellness.values, 
-                                    color=context_colors, alpha=0.8)
-                axes[1, 0].axhline(y=self.UMBRAL_RIESGO, color='red', linestyle='--', 
-                                  label='Umbral de Riesgo')
-                axes[1, 0].set_title('Puntuación de Bienestar Promedio por Contexto', fontsize=18)
-                axes[1, 0].set_ylabel(self.LABEL_BIENESTAR)
-                axes[1, 0].legend()
-                # Ajustar etiquetas del eje x
-                axes[1, 0].set_xticks(range(len(context_wellness)))
-                # Envolver el texto de las etiquetas largas
-                wrapped_labels = [textwrap.fill(label, width=25, break_long_words=False) 
-                                for label in context_wellness.index]
-                axes[1, 0].set_xticklabels(wrapped_labels, rotation=45, ha='right')
-                # Ajustar los márgenes para las etiquetas
-                plt.setp(axes[1, 0].get_xticklabels(), fontsize=9)
-                # Añadir valores sobre las barras
-                for idx, v in enumerate(context_wellness.values):
-                    axes[1, 0].text(idx, v + 0.05, f'{v:.2f}', ha='center', va='bottom')
+        if not context_stats.empty:
+            context_wellness = context_stats['wellness']
+            logger.debug("context_wellness:\n%s", context_wellness)
+            # Usar los colores ya inicializados
+            context_colors = [self.context_colors.get(context, '#CCCCCC') for context in context_wellness.index]
+            bars = axes[1, 0].bar(range(len(context_wellness)), context_wellness.values, 
+                                color=context_colors, alpha=0.8)
+            axes[1, 0].axhline(y=self.UMBRAL_RIESGO, color='red', linestyle='--', 
+                              label='Umbral de Riesgo')
+            axes[1, 0].set_title('Puntuación de Bienestar Promedio por Contexto', fontsize=18)
+            axes[1, 0].set_ylabel(self.LABEL_BIENESTAR)
+            axes[1, 0].legend()
+            # Ajustar etiquetas del eje x
+            axes[1, 0].set_xticks(range(len(context_wellness)))
+            # Envolver el texto de las etiquetas largas
+            wrapped_labels = self._wrap(context_wellness.index, 25)
+            axes[1, 0].set_xticklabels(wrapped_labels, rotation=45, ha='right', fontsize=9)
+            # Añadir valores sobre las barras
+            axes[1, 0].bar_label(bars, fmt='%.2f', padding=3)
         
         # Gráfico 4: Número de encuestas por contexto (si hay datos de encuestas)
-        if not surveys_df.empty and 'user_id' in surveys_df.columns:
-            # Combinar con datos de usuario para obtener contexto
-            surveys_with_context = surveys_df.merge(
-                users_df[['user_id', 'context']], on='user_id', how='left'
-            )
-            if 'context' in surveys_with_context.columns:
-                context_surveys = surveys_with_context.groupby('context').size()
-                print(f"context_surveys:\n{context_surveys}")
-                # Usar los colores ya inicializados
-                context_colors = [self.context_colors.get(context, '#CCCCCC') for context in context_surveys.index]
-                axes[1, 1].bar(range(len(context_surveys)), context_surveys.values, color=context_colors)
-                axes[1, 1].set_title('Número de Encuestas por Contexto', fontsize=18)
-                axes[1, 1].set_ylabel('Número de Encuestas')
-                # Ajustar etiquetas del eje x
-                axes[1, 1].set_xticks(range(len(context_surveys)))
-                # Envolver el texto de las etiquetas largas
-                wrapped_labels = [textwrap.fill(label, width=25, break_long_words=False) 
-                                for label in context_surveys.index]
-                axes[1, 1].set_xticklabels(wrapped_labels, rotation=45, ha='right')
-                # Ajustar los márgenes para las etiquetas
-                plt.setp(axes[1, 1].get_xticklabels(), fontsize=9)
-                # Añadir valores sobre las barras
-                for idx, v in enumerate(context_surveys.values):
-                    axes[1, 1].text(idx, v + 0.05, str(v), ha='center', va='bottom')
-        
-        # Ajustar el espaciado entre subplots para acomodar las etiquetas envueltas
-        plt.tight_layout(pad=3.0, h_pad=4.0, w_pad=3.0)
-        
-        # Ajustar los márgenes inferiores para dar espacio a las etiquetas
-        plt.subplots_adjust(bottom=0.2)
-        
-        filename = f"context_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{self.output_format}"
+        if not context_stats.empty:
+            context_surveys = context_stats['n']
+            logger.debug("context_surveys:\n%s", context_surveys)
+            # Usar los colores ya inicializados
+            context_colors = [self.context_colors.get(context, '#CCCCCC') for context in context_surveys.index]
+            bars = axes[1, 1].bar(range(len(context_surveys)), context_surveys.values, color=context_colors)
+            axes[1, 1].set_title('Número de Encuestas por Contexto', fontsize=18)
+            axes[1, 1].set_ylabel('Número de Encuestas')
+            # Ajustar etiquetas del eje x
+            axes[1, 1].set_xticks(range(len(context_surveys)))
+            # Envolver el texto de las etiquetas largas
+            wrapped_labels = self._wrap(context_surveys.index, 25)
+            axes[1, 1].set_xticklabels(wrapped_labels, rotation=45, ha='right', fontsize=9)
+            # Añadir valores sobre las barras
+            axes[1, 1].bar_label(bars, padding=3)
+        
+        filename = f"context_analysis_{self._run_ts}.{self.output_format}"
         filepath = os.path.join(self.output_path, filename)
-        plt.savefig(filepath, dpi=300, bbox_inches='tight', pad_inches=0.5, format=self.output_format)
-        plt.close()
+        self._save_figure(fig, filepath)
+        fig.clear()  # Se reutiliza la figura en el siguiente gráfico
         
         print(f"✅ Análisis por contexto guardado: {filepath}")
         return filepath
     
+    @_styled
     def create_avg_emotional_state_by_context(self) -> str:
         """
         Genera un gráfico de barras que muestra el estado emocional promedio por contexto.
@@ -577,7 +954,7 @@ class VisualizationGenerator:
             str: Ruta del archivo generado
         """
         # Cargar los datos base
-        users_df, surveys_df = self.analyzer.load_data()
+        users_df, surveys_df = self._get_data()
 
         # Validaciones
         if surveys_df.empty or 'wellness_score' not in surveys_df.columns:
@@ -589,13 +966,11 @@ class VisualizationGenerator:
             return ""
 
         # Combinar encuestas con contexto
-        surveys_with_context = surveys_df.merge(
-            users_df[['user_id', 'context']], on='user_id', how='left'
-        )
+        surveys_with_context = self._get_surveys_with_context()
 
         # Calcular promedio por contexto
         avg_emotional_state = (
-            surveys_with_context.groupby('context')['wellness_score']
+            surveys_with_context.groupby('context', sort=False, observed=True)['wellness_score']
             .mean()
             .sort_values(ascending=False)
         )
@@ -603,97 +978,67 @@ class VisualizationGenerator:
         if avg_emotional_state.empty:
             print("❌ No hay datos válidos para graficar el estado emocional por contexto.")
             return ""
-        print(f"avg_emotional_state:\n{avg_emotional_state}")
+        logger.debug("avg_emotional_state:\n%s", avg_emotional_state)
         
         # Umbral
         threshold = 3.0
 
         # Crear colores con transparencia según distancia al umbral
-        colors = []
-        for val in avg_emotional_state.values:
-            if val >= threshold:
-                base_color = mcolors.to_rgba("green")
-            else:
-                base_color = mcolors.to_rgba("red")
-            # Cuanto más cerca del umbral, más transparente
-            alpha = min(1.0, 0.3 + abs(val - threshold) / 2.5)
-            color = (base_color[0], base_color[1], base_color[2], alpha)
-            colors.append(color)
+        values = avg_emotional_state.to_numpy(dtype=np.float32)
+        colors = np.where((values >= threshold)[:, None], _RGBA_GREEN, _RGBA_RED)
+        # Cuanto más cerca del umbral, más transparente
+        colors[:, 3] = np.minimum(1.0, 0.3 + np.abs(values - threshold) / 2.5)
 
         # Crear índices numéricos para reemplazar textos largos
         context_labels = avg_emotional_state.index.tolist()
         numeric_positions = range(1, len(context_labels) + 1)
 
-        # Crear figura
-        plt.figure(figsize=(14, 10))
-        bars = plt.bar(numeric_positions, avg_emotional_state.values, color=colors)
+        # Crear figura: gráfico arriba y tabla de contextos en sus propios ejes debajo,
+        # para que el diseño 'constrained' reserve el espacio de ambos
+        fig = self._get_figure('legend', (14, 10))
+        ax, table_ax = fig.subplots(2, 1, height_ratios=[3, 1])
+        table_ax.axis('off')
+        bars = ax.bar(numeric_positions, avg_emotional_state.values, color=colors)
 
         # Línea de referencia
-        plt.axhline(y=threshold, color='gray', linestyle='--', linewidth=1.5, label=f'Umbral de bienestar ({threshold})')
+        ax.axhline(y=threshold, color='gray', linestyle='--', linewidth=1.5, label=f'Umbral de bienestar ({threshold})')
 
         # Etiquetas y título
-        plt.title("Estado Emocional Promedio por Contexto", fontsize=18)
-        plt.xlabel("ID de Contexto", fontsize=14)
-        plt.ylabel("Puntuación Promedio de Bienestar", fontsize=14)
+        ax.set_title("Estado Emocional Promedio por Contexto", fontsize=18)
+        ax.set_xlabel("ID de Contexto", fontsize=14)
+        ax.set_ylabel("Puntuación Promedio de Bienestar", fontsize=14)
 
         # Mostrar valores sobre cada barra
-        for bar, value in zip(bars, avg_emotional_state.values):
-            plt.text(
-                bar.get_x() + bar.get_width()/2,
-                bar.get_height() + 0.05,
-                f"{value:.2f}",
-                ha='center',
-                va='bottom',
-                fontsize=10
-            )
-
-        plt.xticks(numeric_positions)
-        plt.grid(axis='y', linestyle='--', alpha=0.3)
-        plt.legend()
+        ax.bar_label(bars, fmt='%.2f', padding=3, fontsize=10)
 
-        plt.tight_layout(rect=[0, 0.35, 1, 1])  # deja espacio para tabla inferior
+        ax.set_xticks(numeric_positions)
+        ax.grid(axis='y', linestyle='--', alpha=0.3)
+        ax.legend()
 
         # ===== Crear tabla de contextos en 2 columnas =====
         n = len(context_labels)
         mid = math.ceil(n / 2)
 
-        # Dividir contextos y colores
-        left_contexts = context_labels[:mid]
-        right_contexts = context_labels[mid:]
-        left_colors = colors[:mid]
-        right_colors = colors[mid:]
-
-        # Preparar filas de la tabla (alinear dos columnas)
-        max_rows = max(len(left_contexts), len(right_contexts))
-        cell_text = []
-        cell_colors = []
-
-        for i in range(max_rows):
-            row = []
-            color_row = []
-            # Columna izquierda
-            if i < len(left_contexts):
-                left_color_hex = mcolors.to_hex(left_colors[i][:3])
-                row.extend([f"{i+1}", left_contexts[i]])
-                color_row.extend([left_color_hex, "white"])
-            else:
-                row.extend(["", ""])
-                color_row.extend(["white", "white"])
-            # Columna derecha
-            if i < len(right_contexts):
-                idx_right = mid + i + 1
-                right_color_hex = mcolors.to_hex(right_colors[i][:3])
-                row.extend([f"{idx_right}", right_contexts[i]])
-                color_row.extend([right_color_hex, "white"])
-            else:
-                row.extend(["", ""])
-                color_row.extend(["white", "white"])
-            cell_text.append(row)
-            cell_colors.append(color_row)
+        # Colores hexadecimales de todos los contextos: RGB a bytes en un solo paso
+        rgb_bytes = np.round(np.asarray(colors)[:, :3] * 255).astype(np.uint8)
+        hex_colors = ['#%02x%02x%02x' % tuple(rgb) for rgb in rgb_bytes]
+
+        # Emparejar columna izquierda y derecha (la derecha se rellena con None)
+        pairs = list(zip_longest(range(mid), range(mid, n)))
+        cell_text = [
+            [f"{left + 1}", context_labels[left],
+             f"{right + 1}" if right is not None else "",
+             context_labels[right] if right is not None else ""]
+            for left, right in pairs
+        ]
+        cell_colors = [
+            [hex_colors[i], "white", hex_colors[j] if j is not None else "white", "white"]
+            for i, j in pairs
+        ]
 
         col_labels = ["ID", "Contexto", "ID", "Contexto"]
 
-        table = plt.table(
+        table = table_ax.table(
             cellText=cell_text,
             colLabels=col_labels,
             cellLoc='left',
@@ -701,69 +1046,58 @@ class VisualizationGenerator:
             colWidths=[0.3, 4, 0.3, 4],
             colColours=['#f0f0f0'] * 4,
             cellColours=cell_colors,
-            bbox=[0.05, -0.42, 0.9, 0.3]  # posición y tamaño: x, y, ancho, alto
+            bbox=[0.05, 0, 0.9, 1]  # posición y tamaño: x, y, ancho, alto
         )
 
         table.auto_set_font_size(False)
         table.set_fontsize(9)
 
-        # Ajustes visuales
-        for (row, col), cell in table.get_celld().items():
-            cell.set_edgecolor('gray')
-            cell.set_linewidth(0.5)
-            if col in [1, 3]:  # contextos
-                cell._text.set_wrap(True)  # permitir salto de línea
-                cell._text.set_fontsize(8)
+        # Ajustes visuales aplicados en bloque con plt.setp
+        cells = table.get_celld()
+        plt.setp(list(cells.values()), edgecolor='gray', linewidth=0.5)
+        # Contextos: permitir salto de línea y letra más pequeña
+        plt.setp([cell.get_text() for (_, col), cell in cells.items() if col in (1, 3)],
+                 wrap=True, fontsize=8)
 
         # Guardar archivo
-        filename = f"avg_emotional_state_by_context_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{self.output_format}"
+        filename = f"avg_emotional_state_by_context_{self._run_ts}.{self.output_format}"
         filepath = os.path.join(self.output_path, filename)
-        plt.savefig(filepath, dpi=300, bbox_inches='tight', format=self.output_format)
-        plt.close()
+        self._save_figure(fig, filepath)
+        fig.clear()  # Se reutiliza la figura en la siguiente llamada
 
         print(f"✅ Gráfico generado y guardado en: {filepath}")
         return filepath
 
-    def create_dashboard_summary(self) -> str:
+    def create_dashboard_summary(self, exported_files: Optional[List[str]] = None) -> str:
         """
         Crea un dashboard resumen con múltiples visualizaciones.
         
+        Args:
+            exported_files (List[str], optional): Archivos ya generados en esta
+                ejecución (p. ej. por `export_all_visualizations`). Si se omite,
+                se generan todos los gráficos antes de escribir el resumen
+        
         Returns:
             str: Ruta del archivo generado
         """
         print("📊 Creando dashboard resumen...")
         
-        # Crear todas las visualizaciones
-        plots_created = []
-        
-        mood_plot = self.create_mood_distribution_plot()
-        if mood_plot:
-            plots_created.append("Distribución de estados de ánimo")
-        
-        trend_plot = self.create_trend_analysis_plot()
-        if trend_plot:
-            plots_created.append("Análisis de tendencias")
+        # Reutilizar los gráficos ya generados en lugar de volver a dibujarlos
+        if exported_files is None:
+            exported_files = self.generate_all(self.ALL_PLOTS)
         
-        correlation_plot = self.create_correlation_heatmap()
-        if correlation_plot:
-            plots_created.append("Matriz de correlaciones")
-        
-        risk_plot = self.create_risk_analysis_plot()
-        if risk_plot:
-            plots_created.append("Análisis de riesgo")
-        
-        context_plot = self.create_user_context_analysis()
-        if context_plot:
-            plots_created.append("Análisis por contexto")
-
-        avg_emotional_state_plot = self.create_avg_emotional_state_by_context()
-        if context_plot:
-            plots_created.append("Análisis estado emocional promedio por contexto")
+        plots_created = []
+        for path in exported_files:
+            name = os.path.basename(path)
+            title = next((title for prefix, title in self.PLOT_TITLES.items()
+                          if name.startswith(prefix)), None)
+            if title:
+                plots_created.append(title)
         
         # Crear un archivo de resumen
         summary_file = os.path.join(
             self.output_path,
-            f"dashboard_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+            f"dashboard_summary_{self._run_ts}.txt"
         )
         
         with open(summary_file, 'w', encoding='utf-8') as f:
@@ -786,43 +1120,122 @@ class VisualizationGenerator:
         
         return summary_file
     
-    def export_all_visualizations(self) -> List[str]:
+    def export_all_visualizations(self, singlecore: bool = False,
+                                  generate_summary: bool = False) -> List[str]:
         """
         Exporta todas las visualizaciones disponibles.
         
+        Args:
+            singlecore (bool): Si True, no usa procesos en paralelo
+            generate_summary (bool): Si True, escribe también el resumen del
+                dashboard a partir de los archivos recién generados
+        
         Returns:
             List[str]: Lista de rutas de archivos generados
         """
         print("🎨 Generando todas las visualizaciones...")
         
-        exported_files = []
-        
         # Lista de métodos de visualización
         visualization_methods = [
-            self.create_mood_distribution_plot,
-            self.create_trend_analysis_plot,
-            self.create_correlation_heatmap,
-            self.create_risk_analysis_plot,
-            self.create_user_context_analysis,
-            self.create_gender_analysis_plot
+            'create_mood_distribution_plot',
+            'create_trend_analysis_plot',
+            'create_correlation_heatmap',
+            'create_risk_analysis_plot',
+            'create_user_context_analysis',
+            'create_gender_analysis_plot'
         ]
         
-        for method in visualization_methods:
-            try:
-                result = method()
-                if result:
-                    exported_files.append(result)
-            except Exception as e:
-                print(f"⚠️ Error generando visualización: {str(e)}")
+        exported_files = self.generate_all(visualization_methods, singlecore=singlecore)
         
-        # Crear dashboard resumen
-        #summary = self.create_dashboard_summary()
-        #if summary:
-        #    exported_files.append(summary)
+        # Crear dashboard resumen con los archivos ya generados
+        if generate_summary:
+            summary = self.create_dashboard_summary(exported_files)
+            if summary:
+                exported_files.append(summary)
         
         print(f"✅ Proceso completo: {len(exported_files)} archivos generados")
         return exported_files
+    
+    def generate_all(self, method_names: Optional[List[str]] = None,
+                     singlecore: bool = False) -> List[str]:
+        """
+        Genera varios gráficos en paralelo, uno por proceso.
+        
+        Matplotlib no es seguro entre hilos, por lo que cada gráfico se dibuja
+        en un proceso aparte. Los datos se cargan una vez aquí; donde existe
+        'fork' los procesos los heredan por copy-on-write, y en otro caso se
+        envían serializados a cada proceso.
+        
+        Args:
+            method_names (List[str], optional): Métodos `create_*` a ejecutar
+                (por defecto, todos los de ALL_PLOTS)
+            singlecore (bool): Si True, genera los gráficos de forma secuencial
+                en este proceso (útil para depurar)
+            
+        Returns:
+            List[str]: Lista de rutas de archivos generados
+        """
+        method_names = method_names or self.ALL_PLOTS
+        self._run_ts = datetime.now().strftime('%Y%m%d_%H%M%S')
+        
+        if singlecore or len(method_names) < 2:
+            results = []
+            for method_name in method_names:
+                try:
+                    results.append(getattr(self, method_name)())
+                except Exception as e:
+                    print(f"⚠️ Error generando visualización: {str(e)}")
+            return [path for path in results if path]
+        
+        data = self._get_data()
+        analyzer_config = {
+            'data_path': self.analyzer.data_path,
+            'output_path': self.analyzer.output_path,
+            'use_parquet': self.analyzer.use_parquet
+        }
+        generator_config = {
+            'output_path': self.output_path,
+            'output_format': self.output_format,
+            'dpi': self.dpi,
+            'png_compress_level': self.png_compress_level,
+            'fast_png': self.fast_png
+        }
+        
+        # Con 'fork' los hijos heredan los DataFrames sin copiarlos ni serializarlos
+        global _SHARED_DATA
+        mp_context = None
+        payload = data
+        if 'fork' in multiprocessing.get_all_start_methods():
+            mp_context = multiprocessing.get_context('fork')
+            _SHARED_DATA = data
+            payload = None
+        
+        exported_files = []
+        max_workers = min(len(method_names), os.cpu_count() or 1)
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context) as executor:
+                futures = [
+                    executor.submit(_render_plot, analyzer_config, generator_config, payload,
+                                    method_name, self._run_ts)
+                    for method_name in method_names
+                ]
+                for future in futures:
+                    try:
+                        result = future.result()
+                        if result:
+                            exported_files.append(result)
+                    except Exception as e:
+                        print(f"⚠️ Error generando visualización: {str(e)}")
+        finally:
+            _SHARED_DATA = None
+        
+        return exported_files
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera las visualizaciones del análisis emocional")
+    parser.add_argument("--singlecore", action="store_true",
+                        help="Genera los gráficos de forma secuencial (sin procesos en paralelo)")
+    args = parser.parse_args()
+    
     viz_generator = VisualizationGenerator()
-    viz_generator.export_all_visualizations()
\ No newline at end of file
+    viz_generator.export_all_visualizations(singlecore=args.singlecore)
\ No newline at end of file
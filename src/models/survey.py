@@ -6,8 +6,8 @@ Representa las encuestas de seguimiento emocional de los usuarios.
 from enum import Enum
 from datetime import datetime
 from typing import Dict
-from sqlmodel import SQLModel, Field
-import uuid
+from sqlmodel import SQLModel, Field, SmallInteger
+from ..utils.idgen import uuid7_str
 
 # Preguntas estándar de la encuesta
 STANDARD_QUESTIONS = {
@@ -31,22 +31,23 @@ class SurveyType(str, Enum):
     QUICK = "rapida"
 
 class SurveyBase(SQLModel):
-    mood: int | None= Field(default=None, ge=1, le=5, description="Puntuación del estado de ánimo (1-5)")
-    anxiety: int | None = Field(default=None, ge=1, le=5, description="Nivel de ansiedad (1-5)")
-    sleep: int | None = Field(default=None, ge=1, le=5, description="Calidad de sueño (1-5)")
-    social: int | None = Field(default=None, ge=1, le=5, description="Conexión social (1-5)")
-    energy: int | None = Field(default=None, ge=1, le=5, description="Nivel de energía (1-5)")
-    stress: int | None = Field(default=None, ge=1, le=5, description="Nivel de estrés (1-5)")
-    hopeful: int | None = Field(default=None, ge=1, le=5, description="Nivel de esperanza (1-5)")
+    # Puntuaciones acotadas 1-5: SMALLINT (2 bytes) en lugar de INT en la tabla
+    mood: int | None= Field(default=None, ge=1, le=5, sa_type=SmallInteger, description="Puntuación del estado de ánimo (1-5)")
+    anxiety: int | None = Field(default=None, ge=1, le=5, sa_type=SmallInteger, description="Nivel de ansiedad (1-5)")
+    sleep: int | None = Field(default=None, ge=1, le=5, sa_type=SmallInteger, description="Calidad de sueño (1-5)")
+    social: int | None = Field(default=None, ge=1, le=5, sa_type=SmallInteger, description="Conexión social (1-5)")
+    energy: int | None = Field(default=None, ge=1, le=5, sa_type=SmallInteger, description="Nivel de energía (1-5)")
+    stress: int | None = Field(default=None, ge=1, le=5, sa_type=SmallInteger, description="Nivel de estrés (1-5)")
+    hopeful: int | None = Field(default=None, ge=1, le=5, sa_type=SmallInteger, description="Nivel de esperanza (1-5)")
     survey_type: SurveyType = Field(default=SurveyType.DAILY, description="Tipo de encuesta (diaria, semanal, especial)")
     user_id: str = Field(description="ID del usuario que responde la encuesta")
     
 class Survey(SurveyBase, table=True):
-    survey_id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
+    survey_id: str = Field(default_factory=uuid7_str, primary_key=True)
     user_id: str = Field(foreign_key="user.user_id", description="ID del usuario que responde la encuesta")
-    date: datetime = Field(default_factory=datetime.now, description="Fecha y hora de la encuesta")
+    date: datetime = Field(default_factory=datetime.now, index=True, description="Fecha y hora de la encuesta")
     wellness_score: float = Field(default=0.0, description="Puntaje de bienestar calculado")
-    crisis_alert: bool = Field(default=False, description="Indica si la encuesta señala una situación de crisis")
+    crisis_alert: bool = Field(default=False, index=True, description="Indica si la encuesta señala una situación de crisis")
 
     def __init__(self, **data):
         super().__init__(**data)
@@ -4,19 +4,23 @@ Representa a un joven que utiliza la plataforma para monitoreo emocional.
 """
 
 from datetime import datetime
+from pydantic import ConfigDict
 from sqlmodel import SQLModel, Field
 from typing import Dict, Any, Optional
-import uuid
+from ..utils.idgen import uuid7_str
 
 class UserBase(SQLModel):
+    # Normaliza los textos durante la validación del payload (sin pasos extra en el router)
+    model_config = ConfigDict(str_strip_whitespace=True)
+    
     name: str = Field(description="Nombre completo del usuario")
     age: int = Field(ge=13, le=25, description="Edad del usuario (entre 13 y 25 años)")
     context: str = Field(description="Contexto de vulnerabilidad del usuario")
     gender: str = Field(default=None, description="Género del usuario")
 
 class User(UserBase, table=True):
-    user_id: Optional[str] = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True, index=True)
-    registration_date: Optional[datetime] = Field(default_factory=datetime.now, description="Fecha de registro en el sistema")
+    user_id: Optional[str] = Field(default_factory=uuid7_str, primary_key=True, index=True)
+    registration_date: Optional[datetime] = Field(default_factory=datetime.now, index=True, description="Fecha de registro en el sistema")
     
 class UserCreate(User):
     """
@@ -46,7 +50,7 @@ class UserCreate(User):
         if not 13 <= age <= 25:
             raise ValueError("La edad debe estar entre 13 y 25 años")
         
-        self.user_id = str(uuid.uuid4())
+        self.user_id = uuid7_str()
         self.name = name.strip()
         self.age = age
         self.context = context.strip()
@@ -1,12 +1,18 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, Response, status
 from ..models.survey import Survey, SurveyBase, get_all_questions
 from ..models.user import User
 from db import session_dependency
 from sqlmodel import select
-from typing import List, Dict
+from ..utils.pagination import NEXT_CURSOR_HEADER, apply_keyset, split_page
+from typing import List, Dict, Optional
+import orjson
 
 router = APIRouter(tags=["Surveys"], prefix="/api")
 
+# Las preguntas son estáticas: se serializan una sola vez al importar el módulo
+_QUESTIONS_BODY = orjson.dumps(get_all_questions())
+_QUESTIONS_HEADERS = {"Cache-Control": "public, max-age=86400"}
+
 @router.get("/survey/questions", response_model=Dict[str, str], status_code=status.HTTP_200_OK)
 async def get_survey_questions():
     """
@@ -15,7 +21,7 @@ async def get_survey_questions():
     Returns:
         Dict[str, str]: Diccionario con las preguntas de la encuesta
     """
-    return get_all_questions()
+    return Response(content=_QUESTIONS_BODY, media_type="application/json", headers=_QUESTIONS_HEADERS)
 
 @router.post("/survey", status_code=status.HTTP_201_CREATED, response_model=Survey)
 async def create_survey(survey_data: SurveyBase, session: session_dependency):
@@ -29,17 +35,17 @@ async def create_survey(survey_data: SurveyBase, session: session_dependency):
         Survey: Datos de la encuesta creada
     """
     # Crear una nueva instancia de Survey con los datos
-    survey = Survey(**survey_data.model_dump())
+    survey = Survey.model_validate(survey_data)
     # Verificar que el usuario exista
     user_id = survey_data.user_id
-    user = session.get(User, user_id)
+    user = await session.get(User, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado")
     # Asegurar que se calculen los campos
     survey._update_calculated_fields()
     session.add(survey)
-    session.commit()
-    session.refresh(survey)
+    await session.commit()
+    await session.refresh(survey)
     return survey
 
 @router.get("/survey/{survey_id}", response_model=Survey)
@@ -53,34 +59,64 @@ async def get_survey(survey_id: str, session: session_dependency):
     Returns:
         Survey: Datos de la encuesta
     """
-    survey = session.get(Survey, survey_id)
+    survey = await session.get(Survey, survey_id)
     if not survey:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Encuesta no encontrada")
     return survey
 
 @router.get("/surveys", response_model=List[Survey])
-async def list_surveys(session: session_dependency):
-    """
-    Endpoint para listar todas las encuestas.
+async def list_surveys(
+    session: session_dependency,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Número máximo de encuestas por página (sin límite: listado completo)"),
+    cursor: Optional[str] = Query(None, description="Cursor de la página anterior (cabecera X-Next-Cursor)")
+):
+    """
+    Endpoint para listar encuestas. Sin parámetros devuelve el listado completo;
+    con `limit` pagina de la más reciente a la más antigua.
     
+    Args:
+        limit (int, opcional): Tamaño de la página (1-500); si se omite se devuelven todas
+        cursor (str, opcional): Cursor devuelto en la cabecera X-Next-Cursor
+        
     Returns:
-        List[Survey]: Lista de encuestas
+        List[Survey]: Página de encuestas; si hay más, el cursor siguiente va en X-Next-Cursor
     """
-    surveys = session.exec(select(Survey)).all()
+    statement = apply_keyset(select(Survey), Survey.date, Survey.survey_id, limit, cursor)
+    rows = (await session.exec(statement)).all()
+    surveys, next_cursor = split_page(rows, limit, "date", "survey_id")
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return surveys
 
 @router.get("/surveys/user/{user_id}", response_model=List[Survey])
-async def get_user_surveys(user_id: str, session: session_dependency):
-    """
-    Endpoint para obtener todas las encuestas de un usuario específico.
+async def get_user_surveys(
+    user_id: str,
+    session: session_dependency,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Número máximo de encuestas por página (sin límite: listado completo)"),
+    cursor: Optional[str] = Query(None, description="Cursor de la página anterior (cabecera X-Next-Cursor)")
+):
+    """
+    Endpoint para obtener las encuestas de un usuario específico. Sin
+    parámetros las devuelve todas; con `limit` pagina de la más reciente a la
+    más antigua.
     
     Args:
         user_id (str): ID del usuario
+        limit (int, opcional): Tamaño de la página (1-500); si se omite se devuelven todas
+        cursor (str, opcional): Cursor devuelto en la cabecera X-Next-Cursor
         
     Returns:
-        List[Survey]: Lista de encuestas del usuario
-    """
-    surveys = session.exec(select(Survey).where(Survey.user_id == user_id)).all()
+        List[Survey]: Página de encuestas del usuario; si hay más, el cursor
+        siguiente va en X-Next-Cursor
+    """
+    statement = apply_keyset(select(Survey).where(Survey.user_id == user_id),
+                             Survey.date, Survey.survey_id, limit, cursor)
+    rows = (await session.exec(statement)).all()
+    surveys, next_cursor = split_page(rows, limit, "date", "survey_id")
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return surveys
 
 @router.delete("/survey/{survey_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -91,11 +127,11 @@ async def delete_survey(survey_id: str, session: session_dependency):
     Args:
         survey_id (str): ID de la encuesta a eliminar
     """
-    survey = session.get(Survey, survey_id)
+    survey = await session.get(Survey, survey_id)
     if not survey:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Encuesta no encontrada")
-    session.delete(survey)
-    session.commit()
+    await session.delete(survey)
+    await session.commit()
     return {"detail": "Encuesta eliminada exitosamente"}
 
 @router.put("/survey/{survey_id}", response_model=Survey)
@@ -110,19 +146,17 @@ async def update_survey(survey_id: str, survey_data: SurveyBase, session: sessio
     Returns:
         Survey: Datos de la encuesta actualizada
     """
-    survey = session.get(Survey, survey_id)
+    survey = await session.get(Survey, survey_id)
     if not survey:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Encuesta no encontrada")
     
-    survey_data_dict = survey_data.model_dump(exclude_unset=True)
-    for key, value in survey_data_dict.items():
-        setattr(survey, key, value)
+    survey.sqlmodel_update(survey_data.model_dump(exclude_unset=True))
     
     # Recalcular los campos después de actualizar los valores
     survey._update_calculated_fields()
     session.add(survey)
-    session.commit()
-    session.refresh(survey)
+    await session.commit()
+    await session.refresh(survey)
     return survey
 
 
@@ -134,8 +168,8 @@ async def get_crisis_surveys(session: session_dependency):
     Returns:
         List[Survey]: Lista de encuestas en estado de crisis
     """
-    all_surveys = session.exec(select(Survey)).all()
-    crisis_surveys = [survey for survey in all_surveys if survey.is_crisis_alert()]
+    # El filtro se resuelve en la base de datos sobre la columna indexada
+    crisis_surveys = (await session.exec(select(Survey).where(Survey.crisis_alert == True))).all()  # noqa: E712
     return crisis_surveys
 
 #@router.get("/survey/{survey_id}/risk-indicators", response_model=List[str])
@@ -149,7 +183,7 @@ async def get_crisis_surveys(session: session_dependency):
 #    Returns:
 #        List[str]: Lista de indicadores de riesgo detectados
 #    """
-#    survey = session.get(Survey, survey_id)
+#    survey = await session.get(Survey, survey_id)
 #    if not survey:
 #        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Encuesta no encontrada")
 #    return survey.get_risk_indicators()
\ No newline at end of file
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, Response, status
+from typing import Optional
 
-from src.utils.demo_info import DemoGenerator
 from ..models.user import User, UserBase
+from ..utils.pagination import NEXT_CURSOR_HEADER, apply_keyset, split_page
 
 # Mensajes y constantes reutilizables
 _MSG_USER_NOT_FOUND = "Usuario no encontrado"
@@ -25,13 +26,12 @@ async def create_user(user_data: UserBase, session: session_dependency):
     Returns:
         User: Datos del usuario creado
     """
-    # Construir una instancia mapeada de User a partir del payload
-    user_dict = user_data.model_dump()
-    user = User(**user_dict)
+    # Construir una instancia mapeada de User a partir del payload ya validado
+    user = User.model_validate(user_data)
 
     session.add(user)
-    session.commit()
-    session.refresh(user)
+    await session.commit()
+    await session.refresh(user)
     return user
 
 @router.get("/user/{user_id}", response_model=User)
@@ -45,20 +45,34 @@ async def get_user(user_id: str, session: session_dependency):
     Returns:
         dict: Datos del usuario
     """
-    user = session.get(User, user_id)
+    user = await session.get(User, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=_MSG_USER_NOT_FOUND)
     return user
 
 @router.get("/users", response_model=list[User])
-async def list_users(session: session_dependency):
+async def list_users(
+    session: session_dependency,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Número máximo de usuarios por página (sin límite: listado completo)"),
+    cursor: Optional[str] = Query(None, description="Cursor de la página anterior (cabecera X-Next-Cursor)")
+):
     """
-    Endpoint para listar todos los usuarios.
+    Endpoint para listar usuarios. Sin parámetros devuelve el listado completo;
+    con `limit` pagina del registro más reciente al más antiguo.
     
+    Args:
+        limit (int, opcional): Tamaño de la página (1-500); si se omite se devuelven todas
+        cursor (str, opcional): Cursor devuelto en la cabecera X-Next-Cursor
+        
     Returns:
-        list: Lista de usuarios
+        list: Página de usuarios; si hay más, el cursor siguiente va en X-Next-Cursor
     """
-    users = session.exec(select(User)).all()
+    statement = apply_keyset(select(User), User.registration_date, User.user_id, limit, cursor)
+    rows = (await session.exec(statement)).all()
+    users, next_cursor = split_page(rows, limit, "registration_date", "user_id")
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return users
 
 @router.delete("/user/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -69,11 +83,11 @@ async def delete_user(user_id: str, session: session_dependency):
     Args:
         user_id (str): ID del usuario a eliminar
     """
-    user = session.get(User, user_id)
+    user = await session.get(User, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=_MSG_USER_NOT_FOUND)
-    session.delete(user)
-    session.commit()
+    await session.delete(user)
+    await session.commit()
     return {"detail": "Usuario eliminado exitosamente"}
 
 @router.put("/user/{user_id}", response_model=User)
@@ -88,17 +102,15 @@ async def update_user(user_id: str, user_data: UserBase, session: session_depend
     Returns:
         dict: Datos del usuario actualizado
     """
-    user = session.get(User, user_id)
+    user = await session.get(User, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado")
     
-    user_data_dict = user_data.model_dump(exclude_unset=True)
-    for key, value in user_data_dict.items():
-        setattr(user, key, value)
+    user.sqlmodel_update(user_data.model_dump(exclude_unset=True))
     
     session.add(user)
-    session.commit()
-    session.refresh(user)
+    await session.commit()
+    await session.refresh(user)
     return user
 
 @router.post("/users/random", status_code=status.HTTP_201_CREATED)
@@ -108,6 +120,9 @@ async def generate_random_users():
     Returns:
         dict: Detalle del resultado de la operación
     """
+    # Importación diferida: evita cargar Faker y los servicios al iniciar la API
+    from src.utils.demo_info import DemoGenerator
+    
     #Crear el generador de datos
     demo = DemoGenerator()
     count_users_generated = demo.generate_demo_data()
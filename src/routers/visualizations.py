@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Response, Query, HTTPException, status
-from fastapi.responses import FileResponse
-from ..analysis.visualizations import VisualizationGenerator
+from fastapi import APIRouter, Response, Query
+from fastapi.responses import FileResponse, ORJSONResponse
+from starlette.concurrency import run_in_threadpool
 from ..analysis.data_analyzer import EmotionalDataAnalyzer
-from typing import Dict, Any
-import json
+from enum import Enum
+from typing import Optional
+import threading
 
 # Constantes reutilizables
 _MSG_NO_DATA = "No hay datos suficientes para generar la visualización"
@@ -12,10 +13,16 @@ _MEDIA_TEXT = "text/plain"
 _MEDIA_SVG = "image/svg+xml"
 _DEFAULT_DAYS = 30
 
-router = APIRouter(tags=["Visualizations"], prefix="/api")
+# pyplot no es seguro entre hilos: los gráficos se generan de uno en uno
+_RENDER_LOCK = threading.Lock()
 
-from enum import Enum
-from typing import Optional
+
+def _render(method):
+    """Ejecuta un método de dibujo con el candado de matplotlib tomado."""
+    with _RENDER_LOCK:
+        return method()
+
+router = APIRouter(tags=["Visualizations"], prefix="/api")
 
 class VisualizationType(str, Enum):
     """Tipos de visualizaciones disponibles"""
@@ -42,6 +49,10 @@ async def get_visualization(
     Returns:
         Response: Imagen SVG con la visualización
     """
+    # Importación diferida: matplotlib solo se carga al pedir el primer gráfico,
+    # no al arrancar la API ni para el endpoint de estadísticas
+    from ..analysis.visualizations import VisualizationGenerator
+    
     # Crear el generador con formato SVG
     analyzer = EmotionalDataAnalyzer()
     viz_generator = VisualizationGenerator(analyzer=analyzer, output_format="svg")
@@ -67,8 +78,9 @@ async def get_visualization(
     # Obtener el método y nombre de archivo correspondiente
     method, filename = visualization_methods[viz_type]
     
-    # Generar la visualización
-    svg_path = method()
+    # Generar la visualización en un hilo aparte: pandas y matplotlib son
+    # síncronos y bloquearían el event loop mientras dibujan
+    svg_path = await run_in_threadpool(_render, method)
     
     if not svg_path:
         return Response(content=_MSG_NO_DATA, media_type=_MEDIA_TEXT, status_code=404)
@@ -89,6 +101,7 @@ async def get_descriptive_statistics():
         Response: Estadísticas descriptivas en formato JSON
     """
     analyzer = EmotionalDataAnalyzer()
-    stats_text = analyzer.generate_descriptive_statistics()
-    stats_json_text = json.dumps(stats_text, default=analyzer.convert_numpy)
-    return json.loads(stats_json_text)
\ No newline at end of file
+    stats = await run_in_threadpool(analyzer.generate_descriptive_statistics)
+    # orjson serializa los tipos de numpy directamente: una sola codificación,
+    # sin el paso por json.dumps/json.loads ni jsonable_encoder
+    return ORJSONResponse(content=stats)
\ No newline at end of file
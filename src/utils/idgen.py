@@ -0,0 +1,65 @@
+"""
+Generación de identificadores únicos.
+Proporciona UUID versión 7 (RFC 9562) en formato texto para las claves primarias.
+"""
+
+import os
+import threading
+import time
+
+# Bytes aleatorios por identificador (se usan 62 bits) y tamaño del depósito:
+# una sola llamada a os.urandom cada 512 identificadores
+_RAND_BYTES = 8
+_POOL_SIZE = 4096
+
+_lock = threading.Lock()
+_pool = b""
+_pool_pos = _POOL_SIZE
+_last_ms = 0
+_counter = 0
+
+
+def uuid7_str() -> str:
+    """
+    Genera un UUID versión 7 como texto.
+
+    Los primeros 48 bits son la marca de tiempo en milisegundos, seguidos de un
+    contador de 12 bits que mantiene el orden dentro del mismo milisegundo, de
+    modo que los identificadores crecen con el tiempo y las inserciones en el
+    índice de la clave primaria son secuenciales. Los 62 bits finales salen de
+    un depósito de bytes aleatorios que se rellena por bloques.
+
+    Returns:
+        str: UUID en formato canónico 8-4-4-4-12
+    """
+    global _pool, _pool_pos, _last_ms, _counter
+
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _last_ms:
+            _last_ms = now_ms
+            _counter = 0
+        else:
+            # Mismo milisegundo (o reloj atrasado): se incrementa el contador y,
+            # si se desborda, se avanza la marca de tiempo para conservar el orden
+            _counter += 1
+            if _counter > 0xFFF:
+                _last_ms += 1
+                _counter = 0
+
+        if _pool_pos + _RAND_BYTES > len(_pool):
+            _pool = os.urandom(_POOL_SIZE)
+            _pool_pos = 0
+        rand = int.from_bytes(_pool[_pool_pos:_pool_pos + _RAND_BYTES], 'big')
+        _pool_pos += _RAND_BYTES
+
+        value = (
+            (_last_ms & 0xFFFF_FFFF_FFFF) << 80
+            | 0x7 << 76                      # versión 7
+            | _counter << 64
+            | 0b10 << 62                     # variante RFC 9562
+            | rand & 0x3FFF_FFFF_FFFF_FFFF
+        )
+
+    hex_value = f"{value:032x}"
+    return f"{hex_value[:8]}-{hex_value[8:12]}-{hex_value[12:16]}-{hex_value[16:20]}-{hex_value[20:]}"
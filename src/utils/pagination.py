@@ -0,0 +1,102 @@
+"""
+Paginación por cursor (keyset) para los endpoints de listado.
+Las páginas se recorren de más reciente a más antiguo sobre (fecha, id), de modo
+que cada página es una búsqueda en el índice en lugar de un OFFSET creciente.
+"""
+
+import base64
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+
+# Cabecera de respuesta con el cursor de la página siguiente
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(date: datetime, row_id: str) -> str:
+    """
+    Codifica la posición de la última fila devuelta como cursor opaco.
+
+    Args:
+        date (datetime): Fecha de la última fila
+        row_id (str): Identificador de la última fila
+
+    Returns:
+        str: Cursor en base64 apto para URL
+    """
+    raw = f"{date.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Decodifica un cursor generado por `encode_cursor`.
+
+    Args:
+        cursor (str): Cursor recibido en la petición
+
+    Returns:
+        Tuple[datetime, str]: Fecha e identificador de la última fila vista
+
+    Raises:
+        HTTPException: 400 si el cursor no es válido
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        date_text, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(date_text), row_id
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor de paginación no válido")
+
+
+def apply_keyset(statement, date_column, id_column, limit: Optional[int], cursor: Optional[str] = None):
+    """
+    Ordena la consulta de más reciente a más antiguo y la limita a una página.
+
+    Se pide una fila más de `limit` para saber si existe una página siguiente
+    sin una consulta COUNT adicional. Sin `limit` ni `cursor` la consulta se
+    devuelve intacta (listado completo, como antes de paginar).
+
+    Args:
+        statement: Consulta `select` de SQLModel
+        date_column: Columna de fecha usada como clave principal del orden
+        id_column: Columna de id que desempata filas con la misma fecha
+        limit (int, optional): Tamaño de la página; None devuelve todas las filas
+        cursor (str, optional): Cursor de la página anterior
+
+    Returns:
+        Consulta con filtro, orden y límite aplicados
+    """
+    if limit is None and not cursor:
+        return statement
+    if cursor:
+        last_date, last_id = decode_cursor(cursor)
+        statement = statement.where(or_(
+            date_column < last_date,
+            and_(date_column == last_date, id_column < last_id)
+        ))
+    statement = statement.order_by(date_column.desc(), id_column.desc())
+    return statement if limit is None else statement.limit(limit + 1)
+
+
+def split_page(rows: List[Any], limit: Optional[int], date_attr: str, id_attr: str) -> Tuple[List[Any], Optional[str]]:
+    """
+    Separa la página solicitada y calcula el cursor de la siguiente.
+
+    Args:
+        rows (List[Any]): Filas devueltas por la consulta de `apply_keyset`
+        limit (int, optional): Tamaño de la página; None si no se paginó
+        date_attr (str): Atributo de fecha de las filas
+        id_attr (str): Atributo de id de las filas
+
+    Returns:
+        Tuple[List[Any], Optional[str]]: Filas de la página y cursor siguiente
+        (None si es la última página)
+    """
+    if limit is None or len(rows) <= limit:
+        return list(rows), None
+    page = list(rows[:limit])
+    last = page[-1]
+    return page, encode_cursor(getattr(last, date_attr), getattr(last, id_attr))